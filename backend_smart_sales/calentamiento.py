@@ -0,0 +1,50 @@
+"""
+Precarga de módulos pesados y del modelo de predicción.
+
+``gunicorn.conf.py`` llama a ``calentar()`` en el proceso maestro antes de
+crear los workers (``preload_app``): así pandas, scikit-learn, matplotlib,
+reportlab, todas las vistas y el modelo se cargan una sola vez y los workers
+comparten esas páginas de memoria por copy-on-write.
+"""
+import gc
+import importlib
+import time
+
+MODULOS = [
+    'numpy',
+    'pandas',
+    'sklearn.ensemble',
+    'sklearn.linear_model',
+    'matplotlib.pyplot',
+    'reportlab.pdfgen.canvas',
+    'reportlab.platypus',
+    'openpyxl',
+]
+
+
+def calentar():
+    """Importa el stack de análisis, resuelve las URLs y carga el modelo vigente."""
+    from django.db import connections
+    from django.urls import get_resolver
+
+    inicio = time.perf_counter()
+    for modulo in MODULOS:
+        importlib.import_module(modulo)
+
+    # Importa todas las vistas (y con ellas reporte.utils, predicciones, etc.)
+    get_resolver().url_patterns
+
+    from predicciones.pronostico import valores_por_hoja
+    from predicciones.registro import cargar_modelo
+
+    model = cargar_modelo()
+    if model is not None and hasattr(model, 'estimators_'):
+        valores_por_hoja(model)
+
+    # Ninguna conexión abierta debe heredarse en los workers
+    connections.close_all()
+
+    # Evita que el recolector de basura de cada worker toque (y copie) estos objetos
+    gc.collect()
+    gc.freeze()
+    return time.perf_counter() - inicio
@@ -0,0 +1,111 @@
+"""
+Paginación por cursor con posición compuesta.
+
+``CursorPagination`` de DRF guarda en el cursor solo el primer campo del
+ordering y resuelve los empates con un OFFSET. Con muchas filas que comparten
+la misma fecha (altas masivas) las páginas profundas vuelven a recorrer todo
+el grupo empatado. Aquí el cursor guarda la tupla completa (``fecha|id``) y la
+página siguiente se filtra con ``(fecha, id) < (f, i)``, así que cada página
+es un rango del índice compuesto y el OFFSET siempre es 0.
+"""
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class CursorPorTuplaPagination(CursorPagination):
+    separador = '|'
+
+    def _get_position_from_instance(self, instance, ordering):
+        valores = []
+        for campo in ordering:
+            attr = campo.lstrip('-')
+            valor = instance[attr] if isinstance(instance, dict) else getattr(instance, attr)
+            valores.append(valor.isoformat() if hasattr(valor, 'isoformat') else str(valor))
+        return self.separador.join(valores)
+
+    def _filtro_posicion(self, queryset, posicion, reverse):
+        """
+        ``Q`` equivalente a comparar la tupla del ordering con ``posicion``:
+        ``(a, b) < (x, y)`` se expande a ``a <= x AND (a < x OR (a = x AND b < y))``.
+        La primera condición acota el rango del índice.
+        """
+        campos = [campo.lstrip('-') for campo in self.ordering]
+        textos = posicion.split(self.separador)
+        if len(textos) != len(campos):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            valores = [
+                queryset.model._meta.get_field(campo).to_python(texto)
+                for campo, texto in zip(campos, textos)
+            ]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+        def operador(i):
+            # Mismo criterio que DRF: (cursor invertido) XOR (campo descendente)
+            return 'lt' if reverse != self.ordering[i].startswith('-') else 'gt'
+
+        filtro = Q()
+        iguales = {}
+        for i, (campo, valor) in enumerate(zip(campos, valores)):
+            filtro |= Q(**iguales, **{f'{campo}__{operador(i)}': valor})
+            iguales[campo] = valor
+        return Q(**{f'{campos[0]}__{operador(0)}e': valores[0]}) & filtro
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Igual que CursorPagination.paginate_queryset salvo el filtro por
+        # posición, que usa la tupla completa en lugar del primer campo.
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self._filtro_posicion(queryset, current_position, reverse))
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
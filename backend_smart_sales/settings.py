@@ -57,7 +57,8 @@ INSTALLED_APPS = [
     "venta",
     "descuento",
     "reporte",
-    "mantenimiento"
+    "mantenimiento",
+    "predicciones"
 ]
 
 # ==========================================
@@ -170,6 +171,18 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# ==========================================
+# PREDICCIONES
+# ==========================================
+# Modelo heredado, usado mientras no haya versiones publicadas en PREDICCIONES_DIR
+PREDICCIONES_MODELO = config("PREDICCIONES_MODELO", default=os.path.join(BASE_DIR, "modelo_ventas.pkl"))
+PREDICCIONES_DIR = config("PREDICCIONES_DIR", default=os.path.join(BASE_DIR, "modelos"))
+PREDICCIONES_VERSIONES_GUARDADAS = config("PREDICCIONES_VERSIONES_GUARDADAS", default=5, cast=int)
+# Segundos que se reutiliza una respuesta de /api/predicciones/ (ver predicciones.cache)
+PREDICCIONES_CACHE_TTL = config("PREDICCIONES_CACHE_TTL", default=300, cast=int)
+# "r" abre los arrays del modelo con mmap de solo lectura en lugar de copiarlos
+PREDICCIONES_MMAP_MODE = config("PREDICCIONES_MMAP_MODE", default=None)
+
 # ==========================================
 # INTERNACIONALIZACIÓN
 # ==========================================
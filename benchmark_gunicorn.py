@@ -0,0 +1,123 @@
+"""
+Compara el arranque y la memoria de gunicorn con la configuración actual
+(``gunicorn.conf.py``: preload + precarga) y con el arranque anterior sin
+configuración.
+
+Para cada modo mide el tiempo hasta la primera respuesta, la latencia de esa
+primera respuesta y, después de repartir peticiones entre los workers, el RSS
+y el PSS (memoria proporcional, descuenta las páginas compartidas) del
+maestro y de los workers leídos de /proc (solo Linux).
+
+Uso:
+    python benchmark_gunicorn.py --workers 4 --url /api/productos/
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+MODOS = {
+    'anterior': ['gunicorn', 'backend_smart_sales.wsgi', '--config', os.devnull],
+    'preload': ['gunicorn', 'backend_smart_sales.wsgi', '--config', 'gunicorn.conf.py'],
+}
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def pedir(url):
+    try:
+        with urllib.request.urlopen(url, timeout=60) as respuesta:
+            respuesta.read()
+    except urllib.error.HTTPError:
+        pass  # 401/404 también cuentan: la petición llegó a Django
+
+
+def memoria(pid):
+    """(rss_kb, pss_kb) del proceso según /proc/<pid>/smaps_rollup."""
+    valores = {}
+    with open(f'/proc/{pid}/smaps_rollup') as archivo:
+        for linea in archivo:
+            partes = linea.split()
+            if partes[0] in ('Rss:', 'Pss:'):
+                valores[partes[0]] = int(partes[1])
+    return valores.get('Rss:', 0), valores.get('Pss:', 0)
+
+
+def hijos(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as archivo:
+        return [int(p) for p in archivo.read().split()]
+
+
+def medir(modo, workers, ruta, peticiones):
+    puerto = puerto_libre()
+    url = f'http://127.0.0.1:{puerto}{ruta}'
+    comando = MODOS[modo] + ['--bind', f'127.0.0.1:{puerto}', '--workers', str(workers)]
+
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(comando, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if proceso.poll() is not None:
+                raise RuntimeError(f"gunicorn ({modo}) terminó al arrancar")
+            try:
+                socket.create_connection(('127.0.0.1', puerto), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        escuchando = time.perf_counter() - inicio
+
+        t = time.perf_counter()
+        pedir(url)
+        primera = time.perf_counter() - t
+        arranque = time.perf_counter() - inicio
+
+        # Repartir peticiones para que todos los workers carguen la aplicación
+        with ThreadPoolExecutor(max_workers=workers * 2) as pool:
+            list(pool.map(pedir, [url] * peticiones))
+        time.sleep(0.5)
+
+        procesos = [proceso.pid] + hijos(proceso.pid)
+        rss, pss = map(sum, zip(*(memoria(pid) for pid in procesos)))
+        return {
+            'modo': modo,
+            'escuchando_s': escuchando,
+            'primera_respuesta_s': arranque,
+            'latencia_primera_ms': primera * 1000,
+            'rss_mb': rss / 1024,
+            'pss_mb': pss / 1024,
+        }
+    finally:
+        proceso.send_signal(signal.SIGTERM)
+        proceso.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--url', default='/api/productos/',
+                        help="Ruta a pedir (default: /api/productos/)")
+    parser.add_argument('--peticiones', type=int, default=40,
+                        help="Peticiones para calentar los workers (default: 40)")
+    parser.add_argument('--modos', nargs='+', choices=list(MODOS), default=list(MODOS))
+    args = parser.parse_args()
+
+    print(f"{'modo':<10} {'escucha s':>10} {'1ª resp. s':>11} {'lat. 1ª ms':>11} "
+          f"{'RSS MB':>9} {'PSS MB':>9}")
+    for modo in args.modos:
+        r = medir(modo, args.workers, args.url, args.peticiones)
+        print(f"{r['modo']:<10} {r['escuchando_s']:>10.2f} {r['primera_respuesta_s']:>11.2f} "
+              f"{r['latencia_primera_ms']:>11.1f} {r['rss_mb']:>9.1f} {r['pss_mb']:>9.1f}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,6 +15,10 @@ class Bitacora(models.Model):
 
     class Meta:
         ordering = ['-fecha_hora']
+        indexes = [
+            # Paginación por cursor (ver bitacora.paginacion)
+            models.Index(fields=['fecha_hora', 'id'], name='bitacora_fecha_hora_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.usuario.username} - {self.accion} ({self.fecha_hora.strftime('%d/%m/%Y %H:%M:%S')})"
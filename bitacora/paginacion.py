@@ -0,0 +1,12 @@
+from backend_smart_sales.paginacion import CursorPorTuplaPagination
+
+
+class BitacoraCursorPagination(CursorPorTuplaPagination):
+    """
+    Paginación por cursor (keyset) sobre la tupla ``(fecha_hora, id)``,
+    respaldada por el índice ``bitacora_fecha_hora_id_idx``.
+    """
+    ordering = ('-fecha_hora', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
@@ -0,0 +1,29 @@
+"""
+Configuración de gunicorn (la carga automáticamente desde el directorio del proyecto).
+
+La aplicación se carga en el proceso maestro (``preload_app``) y ``when_ready``
+precarga el stack de análisis y el modelo antes del fork, de modo que los
+workers comparten esa memoria en lugar de importar todo por separado.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+preload_app = True
+
+
+def when_ready(server):
+    from backend_smart_sales.calentamiento import calentar
+
+    segundos = calentar()
+    server.log.info("🔥 Módulos y modelo precargados en %.2fs", segundos)
+
+
+def pre_fork(server, worker):
+    # Las conexiones a la base no se pueden compartir entre procesos: cada
+    # worker abre las suyas después del fork.
+    from django.db import connections
+
+    connections.close_all()
+
@@ -15,7 +15,8 @@ from .serializers import (
     MantenimientoAsignarTecnicoSerializer,
     MantenimientoActualizarEstadoSerializer
 )
-from venta.models import Venta, DetalleVenta, Garantia
+from venta.models import Venta, DetalleVenta
+from venta.garantias import garantias_vigentes
 from users.models import CustomUser
 
 
@@ -80,15 +81,10 @@ class MantenimientoListCreateView(generics.ListCreateAPIView):
             })
         
         # 4. Verificar si está cubierto por garantía
-        cubierto_por_garantia = False
-        garantia = Garantia.objects.filter(
+        cubierto_por_garantia = garantias_vigentes().filter(
             producto=producto,
-            venta=venta,
-            estado='activa'
-        ).first()
-        
-        if garantia and garantia.fecha_fin >= timezone.now().date():
-            cubierto_por_garantia = True
+            venta=venta
+        ).exists()
         
         # 5. Auto-asignar técnico si existe (opcional, puede dejarse None para que admin asigne)
         tecnico = None
@@ -15,6 +15,8 @@ from producto.models import Producto
 from marca.models import Marca
 from categoria.models import Categoria
 from venta.models import Venta, DetalleVenta
+from venta.resumenes import reconstruir_ventas_diarias, reconstruir_resumen_clientes
+from predicciones.entrenamiento import entrenar_si_hace_falta
 
 fake = Faker()
 
@@ -162,6 +164,11 @@ def poblar_datos():
     crear_usuarios()
     print("Creando ventas... - poblar.py:163")
     crear_ventas()
+    print("Reconstruyendo resumen diario de ventas...")
+    reconstruir_ventas_diarias()
+    reconstruir_resumen_clientes()
+    print("Entrenando modelo de predicción de ventas...")
+    entrenar_si_hace_falta(forzar=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,175 @@
+"""
+Almacén versionado de modelos de predicción.
+
+Cada versión se publica como ``modelo_ventas-<version>.pkl`` más sus metadatos
+en ``modelo_ventas-<version>.json`` dentro de ``PREDICCIONES_DIR``; el archivo
+``actual.json`` apunta a la versión vigente (y marca si fue fijada a mano con
+una vuelta atrás, para que el reentrenamiento automático no la pise). Todo se escribe en un temporal
+del mismo directorio y se mueve con ``os.replace``, así que un lector nunca ve
+un archivo a medio escribir. Un ``flock`` garantiza un solo entrenamiento a la
+vez entre procesos, y se conservan las últimas ``PREDICCIONES_VERSIONES_GUARDADAS``
+versiones para poder volver atrás.
+"""
+import fcntl
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+import joblib
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+PREFIJO = 'modelo_ventas-'
+PUNTERO = 'actual.json'
+BLOQUEO = '.entrenamiento.lock'
+
+
+class VersionNoEncontrada(Exception):
+    pass
+
+
+def directorio():
+    ruta = str(settings.PREDICCIONES_DIR)
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
+
+
+def _ruta(nombre):
+    return os.path.join(directorio(), nombre)
+
+
+def _escribir_atomico(destino, escribir):
+    """Llama ``escribir(ruta_temporal)`` y mueve el resultado a ``destino``."""
+    fd, temporal = tempfile.mkstemp(dir=os.path.dirname(destino), prefix='.tmp-')
+    os.close(fd)
+    try:
+        escribir(temporal)
+        with open(temporal, 'rb') as archivo:
+            os.fsync(archivo.fileno())
+        os.replace(temporal, destino)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def _escribir_json(destino, datos):
+    def escribir(ruta):
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(datos, archivo, cls=DjangoJSONEncoder, ensure_ascii=False, indent=2)
+    _escribir_atomico(destino, escribir)
+
+
+def _leer_json(ruta):
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+
+@contextmanager
+def bloqueo_entrenamiento():
+    """
+    Bloqueo exclusivo entre procesos. Produce ``True`` si se obtuvo y
+    ``False`` si otro proceso ya está entrenando.
+    """
+    with open(_ruta(BLOQUEO), 'w') as archivo:
+        try:
+            fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(archivo, fcntl.LOCK_UN)
+
+
+def _puntero():
+    try:
+        return _leer_json(_ruta(PUNTERO))
+    except FileNotFoundError:
+        return None
+
+
+def version_fijada():
+    """``True`` si la versión vigente se activó a mano (``activar_version(..., fijar=True)``)."""
+    puntero = _puntero()
+    return bool(puntero and puntero.get('fijado'))
+
+
+def version_vigente():
+    """Metadatos de la versión publicada o ``None`` si no hay ninguna."""
+    puntero = _puntero()
+    if puntero is None:
+        return None
+    return metadatos(puntero['version'])
+
+
+def metadatos(version):
+    try:
+        return _leer_json(_ruta(f"{PREFIJO}{version}.json"))
+    except FileNotFoundError:
+        raise VersionNoEncontrada(version)
+
+
+def ruta_modelo(version):
+    return _ruta(f"{PREFIJO}{version}.pkl")
+
+
+def ruta_puntero():
+    return _ruta(PUNTERO)
+
+
+def versiones():
+    """Metadatos de todas las versiones guardadas, de la más nueva a la más vieja."""
+    nombres = sorted(
+        (n for n in os.listdir(directorio()) if n.startswith(PREFIJO) and n.endswith('.json')),
+        reverse=True,
+    )
+    return [_leer_json(_ruta(nombre)) for nombre in nombres]
+
+
+def publicar_modelo(modelo, **datos):
+    """
+    Guarda ``modelo`` como versión nueva con sus metadatos, la marca como
+    vigente y elimina las versiones que exceden el máximo a conservar.
+    """
+    version = timezone.now().strftime('%Y%m%d%H%M%S%f')
+    ruta = ruta_modelo(version)
+    _escribir_atomico(ruta, lambda temporal: joblib.dump(modelo, temporal))
+
+    info = {
+        'version': version,
+        'archivo': os.path.basename(ruta),
+        'tamano_bytes': os.path.getsize(ruta),
+        'publicado_en': timezone.now(),
+        **datos,
+    }
+    _escribir_json(_ruta(f"{PREFIJO}{version}.json"), info)
+    activar_version(version)
+    podar_versiones()
+    return info
+
+
+def activar_version(version, fijar=False):
+    """
+    Apunta ``actual.json`` a ``version``. Las publicaciones la activan sin
+    fijar; una vuelta atrás manual usa ``fijar=True`` y el reentrenamiento
+    automático la respeta hasta un entrenamiento forzado.
+    """
+    metadatos(version)
+    _escribir_json(_ruta(PUNTERO), {'version': version, 'fijado': fijar})
+
+
+def podar_versiones(conservar=None):
+    conservar = conservar or settings.PREDICCIONES_VERSIONES_GUARDADAS
+    vigente = version_vigente()
+    for info in versiones()[conservar:]:
+        if vigente and info['version'] == vigente['version']:
+            continue
+        for extension in ('.pkl', '.json'):
+            try:
+                os.remove(_ruta(f"{PREFIJO}{info['version']}{extension}"))
+            except FileNotFoundError:
+                pass
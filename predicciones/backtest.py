@@ -0,0 +1,89 @@
+"""
+Backtesting con origen móvil del pronóstico de ventas mensuales.
+
+Para cada mes de corte se entrena con la historia anterior y se pronostican
+los ``horizonte`` meses siguientes; se compara el modelo actual (bosque de 100
+árboles) con alternativas más baratas sobre las mismas variables.
+"""
+import io
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from .pronostico import COLUMNAS_MODELO
+
+
+class EstacionalIngenuo:
+    """Repite el valor del mismo mes del año anterior (o el último si no hay)."""
+
+    def fit(self, X, y):
+        self.historia = np.asarray(y, dtype=float)
+        return self
+
+    def predict(self, X):
+        n = len(self.historia)
+        pasos = np.arange(1, len(X) + 1)
+        indices = np.where(n >= 12, n - 12 + (pasos - 1) % 12, n - 1)
+        return self.historia[indices]
+
+
+CANDIDATOS = {
+    'bosque_100': lambda: RandomForestRegressor(n_estimators=100, random_state=42),
+    'bosque_25': lambda: RandomForestRegressor(n_estimators=25, random_state=42),
+    'bosque_10': lambda: RandomForestRegressor(n_estimators=10, random_state=42),
+    'lineal': LinearRegression,
+    'estacional_ingenuo': EstacionalIngenuo,
+}
+
+
+def _tamano(modelo):
+    buffer = io.BytesIO()
+    joblib.dump(modelo, buffer)
+    return buffer.tell()
+
+
+def backtest(data, horizonte=3, minimo_entrenamiento=12, candidatos=None):
+    """
+    Devuelve una fila de métricas por candidato: MAPE (%), RMSE, tiempos
+    medios de ajuste y predicción (ms) y tamaño del artefacto (bytes).
+    """
+    candidatos = candidatos or list(CANDIDATOS)
+    X = data[COLUMNAS_MODELO].to_numpy()
+    y = data['total_ventas'].to_numpy(dtype=float)
+    cortes = range(minimo_entrenamiento, len(y) - horizonte + 1)
+
+    resultados = []
+    for nombre in candidatos:
+        errores, reales, ajustes, predicciones = [], [], [], []
+        modelo = None
+        for corte in cortes:
+            modelo = CANDIDATOS[nombre]()
+
+            inicio = time.perf_counter()
+            modelo.fit(X[:corte], y[:corte])
+            ajustes.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            estimado = modelo.predict(X[corte:corte + horizonte])
+            predicciones.append(time.perf_counter() - inicio)
+
+            reales.append(y[corte:corte + horizonte])
+            errores.append(estimado - y[corte:corte + horizonte])
+
+        if modelo is None:
+            continue
+        errores, reales = np.concatenate(errores), np.concatenate(reales)
+        no_cero = reales != 0
+        resultados.append({
+            'modelo': nombre,
+            'cortes': len(cortes),
+            'mape': float(np.mean(np.abs(errores[no_cero] / reales[no_cero])) * 100) if no_cero.any() else None,
+            'rmse': float(np.sqrt(np.mean(errores ** 2))),
+            'ajuste_ms': float(np.mean(ajustes) * 1000),
+            'prediccion_ms': float(np.mean(predicciones) * 1000),
+            'tamano_bytes': _tamano(modelo),
+        })
+    return resultados
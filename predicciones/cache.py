@@ -0,0 +1,31 @@
+"""
+Caché de respuestas de ``/api/predicciones/...``.
+
+La clave incluye la versión del modelo y la marca de agua de ventas (última
+venta registrada), así que una venta nueva o un modelo recién publicado
+generan claves nuevas y las anteriores simplemente expiran. Los cambios de
+estado de ventas existentes no mueven la marca de agua; para ellos el TTL
+``PREDICCIONES_CACHE_TTL`` acota cuánto puede tardar en reflejarse el cambio.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .entrenamiento import marca_de_agua
+from .registro import version_modelo
+
+
+def clave_respuesta(endpoint, meses=None, intervalos=False):
+    marca = marca_de_agua()
+    ultima_fecha = marca['ultima_fecha'].timestamp() if marca['ultima_fecha'] else 0
+    return (
+        f"predicciones:{endpoint}:{version_modelo()}:"
+        f"{marca['ultima_venta_id'] or 0}:{ultima_fecha}:{meses}:{int(intervalos)}"
+    )
+
+
+def obtener(clave):
+    return cache.get(clave)
+
+
+def guardar(clave, datos):
+    cache.set(clave, datos, settings.PREDICCIONES_CACHE_TTL)
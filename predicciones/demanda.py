@@ -0,0 +1,136 @@
+"""
+Pronóstico de demanda mensual (unidades) por producto para todo el catálogo.
+
+La historia se lee con una sola consulta agrupada y se pivotea a una matriz
+``productos x meses``. Todos los productos comparten las mismas variables
+(tendencia, ``mes_sin``, ``mes_cos``), así que cada bloque de productos se
+ajusta con un único ``lstsq`` de múltiples columnas; los bloques se reparten
+entre procesos con ``ProcessPoolExecutor``.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.db.models import DateField, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from producto.models import Producto
+from venta.models import DetalleVenta
+from .models import PrediccionProducto
+
+MESES_HISTORIA = 24
+TAMANO_BLOQUE = 1000
+
+
+def historial_unidades(meses_historia=MESES_HISTORIA):
+    """
+    Devuelve ``(producto_ids, periodos, Y)`` donde ``Y[i, j]`` son las unidades
+    vendidas del producto ``producto_ids[i]`` en el mes ``periodos[j]``.
+    """
+    filas = (
+        DetalleVenta.objects.exclude(venta__estado='cancelado')
+        .annotate(mes=TruncMonth('venta__fecha', output_field=DateField()))
+        .values('producto_id', 'mes')
+        .annotate(unidades=Sum('cantidad'))
+        .order_by()
+    )
+    ventas = pd.DataFrame.from_records(
+        filas.iterator(), columns=['producto_id', 'mes', 'unidades']
+    )
+    producto_ids = np.fromiter(
+        Producto.objects.order_by('id').values_list('id', flat=True).iterator(), dtype=np.int64
+    )
+    return matriz_desde_ventas(ventas, producto_ids, meses_historia)
+
+
+def matriz_desde_ventas(ventas, producto_ids, meses_historia=MESES_HISTORIA):
+    """Pivotea filas ``(producto_id, mes, unidades)`` a la matriz productos x meses."""
+    if ventas.empty:
+        return producto_ids, pd.PeriodIndex([], freq='M'), np.zeros((len(producto_ids), 0))
+
+    meses = pd.PeriodIndex(pd.to_datetime(ventas['mes']), freq='M')
+    ultimo = meses.max()
+    periodos = pd.period_range(max(meses.min(), ultimo - (meses_historia - 1)), ultimo, freq='M')
+    matriz = (
+        ventas.assign(mes=meses)
+        .pivot_table(index='producto_id', columns='mes', values='unidades',
+                     aggfunc='sum', fill_value=0)
+        .reindex(index=producto_ids, columns=periodos, fill_value=0)
+    )
+    return producto_ids, periodos, matriz.to_numpy(dtype=np.float64)
+
+
+def matriz_diseno(indices, meses):
+    """Intercepto, tendencia y estacionalidad mensual: una fila por mes."""
+    angulo = 2 * np.pi * np.asarray(meses) / 12
+    return np.column_stack([np.ones(len(indices)), indices, np.sin(angulo), np.cos(angulo)])
+
+
+def _ajustar_bloque(argumentos):
+    X, X_futuro, Y = argumentos
+    coeficientes, *_ = np.linalg.lstsq(X, Y.T, rcond=None)
+    return np.clip(X_futuro @ coeficientes, 0, None).T
+
+
+def pronosticar_matriz(Y, periodos, horizonte, procesos=1, bloque=TAMANO_BLOQUE):
+    """
+    Pronostica ``horizonte`` meses para cada fila de ``Y``. Devuelve
+    ``(periodos_futuros, matriz productos x horizonte)``.
+    """
+    futuros = pd.period_range(periodos[-1] + 1, periods=horizonte, freq='M')
+    X = matriz_diseno(np.arange(len(periodos)), periodos.month)
+    X_futuro = matriz_diseno(np.arange(len(periodos), len(periodos) + horizonte), futuros.month)
+
+    bloques = [(X, X_futuro, Y[i:i + bloque]) for i in range(0, len(Y), bloque)]
+    if procesos > 1 and len(bloques) > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = list(pool.map(_ajustar_bloque, bloques))
+    else:
+        resultados = [_ajustar_bloque(argumentos) for argumentos in bloques]
+
+    if not resultados:
+        return futuros, np.zeros((0, horizonte))
+    return futuros, np.vstack(resultados)
+
+
+@transaction.atomic
+def guardar_pronosticos(producto_ids, futuros, unidades):
+    generado_en = timezone.now()
+    meses = [periodo.to_timestamp().date() for periodo in futuros]
+    PrediccionProducto.objects.all().delete()
+    PrediccionProducto.objects.bulk_create(
+        (
+            PrediccionProducto(
+                producto_id=int(producto_id),
+                mes=mes,
+                unidades=round(float(valor), 2),
+                generado_en=generado_en,
+            )
+            for producto_id, fila in zip(producto_ids, unidades)
+            for mes, valor in zip(meses, fila)
+        ),
+        batch_size=5000,
+    )
+
+
+def generar_pronosticos(horizonte=6, meses_historia=MESES_HISTORIA, procesos=1, bloque=TAMANO_BLOQUE):
+    """Recalcula y guarda la demanda de todos los productos. Devuelve los tiempos."""
+    tiempos = {}
+    inicio = time.perf_counter()
+    producto_ids, periodos, Y = historial_unidades(meses_historia)
+    tiempos['lectura'] = time.perf_counter() - inicio
+    if Y.shape[1] == 0:
+        return {'productos': 0, 'meses_historia': 0, **tiempos}
+
+    inicio = time.perf_counter()
+    futuros, unidades = pronosticar_matriz(Y, periodos, horizonte, procesos, bloque)
+    tiempos['ajuste'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    guardar_pronosticos(producto_ids, futuros, unidades)
+    tiempos['guardado'] = time.perf_counter() - inicio
+
+    return {'productos': len(producto_ids), 'meses_historia': len(periodos), **tiempos}
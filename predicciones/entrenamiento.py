@@ -0,0 +1,81 @@
+"""
+Entrenamiento del modelo de predicción de ventas fuera del request.
+
+El comando ``entrenar_modelo_ventas`` reentrena solo cuando la marca de agua
+de ventas (última venta registrada) avanzó respecto del modelo publicado; las
+vistas se limitan a leer el último modelo publicado.
+"""
+import time
+
+from django.db.models import Max
+from django.utils import timezone
+from sklearn.ensemble import RandomForestRegressor
+
+from venta.models import Venta
+from . import artefactos
+from .pronostico import COLUMNAS_MODELO, serie_mensual, valores_por_hoja
+from .registro import cargar_modelo
+
+
+def marca_de_agua():
+    """Última venta registrada: ``{'ultima_venta_id': ..., 'ultima_fecha': ...}``."""
+    return Venta.objects.aggregate(ultima_venta_id=Max('id'), ultima_fecha=Max('fecha'))
+
+
+def entrenar_modelo(data, anterior=None):
+    """Entrena el bosque aleatorio con la serie mensual completa."""
+    model = RandomForestRegressor(n_estimators=100, random_state=42)
+    model.fit(data[COLUMNAS_MODELO], data['total_ventas'])
+    model.ultimo_mes = data['mes'].iloc[-1]
+    model.ultimo_año = data['año'].iloc[-1]
+    model.primer_año = getattr(anterior, 'primer_año', data['año'].min())
+    model.primer_mes = getattr(anterior, 'primer_mes', data['mes'].min())
+    # Se publica junto al modelo para calcular intervalos sin recorrer los árboles
+    valores_por_hoja(model)
+    return model
+
+
+def _marca_serializada(marca):
+    return {
+        'ultima_venta_id': marca['ultima_venta_id'],
+        'ultima_fecha': marca['ultima_fecha'].isoformat() if marca['ultima_fecha'] else None,
+    }
+
+
+def entrenar_si_hace_falta(forzar=False):
+    """
+    Entrena y publica un modelo nuevo si hay ventas posteriores al modelo
+    vigente (o si ``forzar``). Devuelve los metadatos de la versión publicada
+    o ``None`` si no hizo falta, si otro proceso ya está entrenando o si la
+    versión vigente fue fijada con una vuelta atrás (solo ``forzar`` la reemplaza).
+    """
+    with artefactos.bloqueo_entrenamiento() as obtenido:
+        if not obtenido:
+            return None
+        if not forzar and artefactos.version_fijada():
+            return None
+
+        marca = _marca_serializada(marca_de_agua())
+        actual = cargar_modelo()
+        if not forzar and actual is not None and getattr(actual, 'marca_de_agua', None) == marca:
+            return None
+
+        data = serie_mensual()
+        if data is None:
+            return None
+
+        inicio = time.perf_counter()
+        model = entrenar_modelo(data, actual)
+        duracion = time.perf_counter() - inicio
+
+        model.marca_de_agua = marca
+        info = artefactos.publicar_modelo(
+            model,
+            marca_de_agua=marca,
+            entrenado_en=timezone.now(),
+            duracion_entrenamiento=round(duracion, 3),
+            filas=len(data),
+            columnas=COLUMNAS_MODELO,
+            parametros={'n_estimators': model.n_estimators, 'random_state': model.random_state},
+        )
+        return info
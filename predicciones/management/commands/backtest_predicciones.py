@@ -0,0 +1,49 @@
+"""
+Compara el modelo de ventas actual con alternativas más baratas usando
+backtesting con origen móvil sobre la historia mensual.
+
+Uso:
+    python manage.py backtest_predicciones --horizonte 3 --minimo 12
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from predicciones.backtest import backtest, CANDIDATOS
+from predicciones.pronostico import serie_mensual
+
+
+class Command(BaseCommand):
+    help = "Backtesting (MAPE/RMSE y costo) de los modelos de predicción de ventas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizonte', type=int, default=3,
+                            help="Meses pronosticados desde cada corte (default: 3)")
+        parser.add_argument('--minimo', type=int, default=12,
+                            help="Meses mínimos de entrenamiento (default: 12)")
+        parser.add_argument('--modelos', nargs='+', choices=list(CANDIDATOS),
+                            help="Candidatos a evaluar (default: todos)")
+
+    def handle(self, *args, **options):
+        data = serie_mensual()
+        if data is None:
+            raise CommandError("No hay datos históricos de ventas.")
+        if len(data) < options['minimo'] + options['horizonte']:
+            raise CommandError(
+                f"Se necesitan al menos {options['minimo'] + options['horizonte']} meses "
+                f"de historia; hay {len(data)}."
+            )
+
+        resultados = backtest(
+            data, options['horizonte'], options['minimo'], options['modelos']
+        )
+
+        self.stdout.write(
+            f"{'modelo':<20} {'cortes':>6} {'MAPE %':>8} {'RMSE':>12} "
+            f"{'ajuste ms':>10} {'pred. ms':>9} {'tamaño KB':>10}"
+        )
+        for fila in resultados:
+            mape = f"{fila['mape']:.2f}" if fila['mape'] is not None else '-'
+            self.stdout.write(
+                f"{fila['modelo']:<20} {fila['cortes']:>6} {mape:>8} {fila['rmse']:>12.2f} "
+                f"{fila['ajuste_ms']:>10.2f} {fila['prediccion_ms']:>9.2f} "
+                f"{fila['tamano_bytes'] / 1024:>10.1f}"
+            )
@@ -0,0 +1,63 @@
+"""
+Mide el pronóstico de demanda por producto sobre datos sintéticos (sin base
+de datos): armado de la matriz y ajuste, con uno y varios procesos.
+
+Uso:
+    python manage.py benchmark_demanda_productos --productos 1000 10000
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from predicciones.demanda import matriz_desde_ventas, pronosticar_matriz, TAMANO_BLOQUE
+
+
+def ventas_sinteticas(productos, meses, semilla=42):
+    """Filas ``(producto_id, mes, unidades)`` con tendencia y estacionalidad."""
+    rng = np.random.default_rng(semilla)
+    periodos = pd.period_range(end=pd.Timestamp.today(), periods=meses, freq='M')
+    base = rng.gamma(2.0, 5.0, size=(productos, 1))
+    estacion = 1 + 0.3 * np.sin(2 * np.pi * periodos.month.to_numpy() / 12)
+    unidades = rng.poisson(base * estacion)
+
+    ventas = pd.DataFrame({
+        'producto_id': np.repeat(np.arange(1, productos + 1), meses),
+        'mes': np.tile(periodos.to_timestamp(), productos),
+        'unidades': unidades.ravel(),
+    })
+    return ventas[ventas['unidades'] > 0]
+
+
+class Command(BaseCommand):
+    help = "Benchmark del pronóstico de demanda por producto."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--productos', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--historia', type=int, default=24)
+        parser.add_argument('--meses', type=int, default=6)
+        parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--bloque', type=int, default=TAMANO_BLOQUE)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'productos':>10} {'procesos':>9} {'matriz':>9} {'ajuste':>9} {'total':>9}")
+
+        for productos in options['productos']:
+            ventas = ventas_sinteticas(productos, options['historia'])
+            ids = np.arange(1, productos + 1)
+
+            for procesos in sorted({1, options['procesos']}):
+                inicio = time.perf_counter()
+                _, periodos, Y = matriz_desde_ventas(ventas, ids, options['historia'])
+                armado = time.perf_counter() - inicio
+
+                inicio = time.perf_counter()
+                pronosticar_matriz(Y, periodos, options['meses'], procesos, options['bloque'])
+                ajuste = time.perf_counter() - inicio
+
+                self.stdout.write(
+                    f"{productos:>10} {procesos:>9} {armado:>8.3f}s {ajuste:>8.3f}s "
+                    f"{armado + ajuste:>8.3f}s"
+                )
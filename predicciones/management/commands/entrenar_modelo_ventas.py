@@ -0,0 +1,52 @@
+"""
+Entrena y publica el modelo de predicción de ventas cuando hay ventas nuevas.
+
+Uso:
+    python manage.py entrenar_modelo_ventas                   # una pasada (cron)
+    python manage.py entrenar_modelo_ventas --intervalo 600   # programador en proceso
+    python manage.py entrenar_modelo_ventas --forzar          # reentrena aunque no haya ventas nuevas
+
+Si la versión vigente se fijó con ``versiones_modelo_ventas --activar``, solo
+``--forzar`` publica una versión nueva (y quita la fijación).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from predicciones.entrenamiento import entrenar_si_hace_falta
+
+
+class Command(BaseCommand):
+    help = "Reentrena el modelo de ventas si la marca de agua de ventas avanzó."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intervalo', type=float, default=0,
+                            help="Segundos entre revisiones; 0 ejecuta una sola vez (default: 0)")
+        parser.add_argument('--forzar', action='store_true',
+                            help="Entrena aunque el modelo publicado esté al día")
+
+    def handle(self, *args, **options):
+        intervalo = options['intervalo']
+        forzar = options['forzar']
+
+        while True:
+            close_old_connections()
+            inicio = time.perf_counter()
+            info = entrenar_si_hace_falta(forzar=forzar)
+            forzar = False
+
+            if info is not None:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ Modelo {info['version']} publicado "
+                    f"(venta #{info['marca_de_agua']['ultima_venta_id']}, "
+                    f"{time.perf_counter() - inicio:.2f}s)"
+                ))
+            else:
+                self.stdout.write(
+                    "ℹ️ El modelo publicado ya está al día, está fijado o hay otro entrenamiento en curso"
+                )
+
+            if intervalo <= 0:
+                break
+            time.sleep(intervalo)
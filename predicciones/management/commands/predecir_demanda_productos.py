@@ -0,0 +1,42 @@
+"""
+Regenera el pronóstico de demanda mensual de todos los productos.
+
+Uso:
+    python manage.py predecir_demanda_productos --meses 6
+"""
+from django.core.management.base import BaseCommand
+
+from predicciones.demanda import generar_pronosticos, MESES_HISTORIA, TAMANO_BLOQUE
+
+
+class Command(BaseCommand):
+    help = "Pronostica la demanda mensual (unidades) de cada producto."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meses', type=int, default=6,
+                            help="Meses a pronosticar (default: 6)")
+        parser.add_argument('--historia', type=int, default=MESES_HISTORIA,
+                            help=f"Meses de historia a usar (default: {MESES_HISTORIA})")
+        parser.add_argument('--procesos', type=int, default=1,
+                            help="Procesos para ajustar los bloques (default: 1)")
+        parser.add_argument('--bloque', type=int, default=TAMANO_BLOQUE,
+                            help=f"Productos por bloque (default: {TAMANO_BLOQUE})")
+
+    def handle(self, *args, **options):
+        resultado = generar_pronosticos(
+            horizonte=options['meses'],
+            meses_historia=options['historia'],
+            procesos=options['procesos'],
+            bloque=options['bloque'],
+        )
+        if not resultado['productos']:
+            self.stdout.write("ℹ️ No hay ventas para pronosticar")
+            return
+
+        tiempos = ", ".join(
+            f"{etapa} {resultado[etapa]:.2f}s" for etapa in ('lectura', 'ajuste', 'guardado')
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {resultado['productos']} productos pronosticados con "
+            f"{resultado['meses_historia']} meses de historia ({tiempos})"
+        ))
@@ -0,0 +1,49 @@
+"""
+Lista las versiones publicadas del modelo de ventas o vuelve a una anterior.
+
+Uso:
+    python manage.py versiones_modelo_ventas                    # listar
+    python manage.py versiones_modelo_ventas --activar VERSION  # volver atrás
+
+La versión activada queda fijada: entrenar_modelo_ventas no la reemplaza hasta
+que se ejecute con --forzar.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from predicciones import artefactos
+
+
+class Command(BaseCommand):
+    help = "Lista las versiones del modelo de ventas o activa una de ellas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--activar', metavar='VERSION',
+                            help="Versión a publicar como vigente")
+
+    def handle(self, *args, **options):
+        if options['activar']:
+            try:
+                artefactos.activar_version(options['activar'], fijar=True)
+            except artefactos.VersionNoEncontrada:
+                raise CommandError(f"No existe la versión {options['activar']}")
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Versión {options['activar']} activada y fijada "
+                f"(entrenar_modelo_ventas --forzar vuelve a publicar)"
+            ))
+            return
+
+        vigente = artefactos.version_vigente()
+        if vigente and artefactos.version_fijada():
+            self.stdout.write(f"📌 Versión {vigente['version']} fijada a mano")
+        versiones = artefactos.versiones()
+        if not versiones:
+            self.stdout.write("ℹ️ No hay versiones publicadas; se usa el modelo heredado")
+            return
+
+        for info in versiones:
+            marca = '*' if vigente and info['version'] == vigente['version'] else ' '
+            self.stdout.write(
+                f"{marca} {info['version']}  venta #{info['marca_de_agua']['ultima_venta_id']}  "
+                f"{info['filas']} meses  {info['duracion_entrenamiento']}s  "
+                f"{info['tamano_bytes'] // 1024} KB"
+            )
@@ -1,3 +1,23 @@
 from django.db import models
 
-# Create your models here.
+from producto.models import Producto
+
+
+class PrediccionProducto(models.Model):
+    """
+    Demanda mensual pronosticada (unidades) por producto. La tabla completa se
+    regenera con el comando ``predecir_demanda_productos``.
+    """
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='predicciones_demanda')
+    mes = models.DateField()  # primer día del mes pronosticado
+    unidades = models.FloatField()
+    generado_en = models.DateTimeField()
+
+    class Meta:
+        ordering = ['producto', 'mes']
+        constraints = [
+            models.UniqueConstraint(fields=['producto', 'mes'], name='prediccion_producto_mes_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.producto_id} - {self.mes:%m/%Y}: {self.unidades:.2f}"
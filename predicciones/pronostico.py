@@ -0,0 +1,114 @@
+"""
+Preparación de datos y predicción de ventas mensuales, compartida por las
+vistas de ``predicciones``.
+"""
+import numpy as np
+import pandas as pd
+from django.db.models import Sum
+
+from venta.models import VentaDiaria
+
+COLUMNAS_MODELO = ['meses_desde_inicio', 'mes_sin', 'mes_cos']
+MESES_POR_DEFECTO = 6
+
+
+def meses_solicitados(request):
+    """Horizonte de predicción pedido en ``?meses=`` (6 si falta o es inválido)."""
+    try:
+        meses = int(request.query_params.get('meses', MESES_POR_DEFECTO))
+    except (TypeError, ValueError):
+        return MESES_POR_DEFECTO
+    return meses if meses >= 1 else MESES_POR_DEFECTO
+
+
+def serie_mensual():
+    """
+    Ventas totales por mes con las variables del modelo, o ``None`` si no
+    hay ventas registradas.
+    """
+    ventas = (
+        VentaDiaria.objects.values('fecha__year', 'fecha__month')
+        .annotate(total_ventas=Sum('total'))
+        .order_by('fecha__year', 'fecha__month')
+    )
+    data = pd.DataFrame(list(ventas))
+    if data.empty:
+        return None
+
+    data.rename(columns={'fecha__year': 'año', 'fecha__month': 'mes'}, inplace=True)
+    data['total_ventas'] = data['total_ventas'].astype(float)
+
+    primer_año = data['año'].min()
+    primer_mes = data['mes'].min()
+    data['meses_desde_inicio'] = (data['año'] - primer_año) * 12 + (data['mes'] - primer_mes)
+    data['mes_sin'] = np.sin(2 * np.pi * data['mes'] / 12)
+    data['mes_cos'] = np.cos(2 * np.pi * data['mes'] / 12)
+    return data
+
+
+def meses_futuros(data, meses):
+    """Variables del modelo para los ``meses`` siguientes al último mes de ``data``."""
+    pasos = np.arange(1, meses + 1)
+    ultimo = data.iloc[-1]
+    indice = int(ultimo['año']) * 12 + int(ultimo['mes']) - 1 + pasos
+
+    futuro = pd.DataFrame({
+        'año': indice // 12,
+        'mes': indice % 12 + 1,
+        'meses_desde_inicio': int(ultimo['meses_desde_inicio']) + pasos,
+    })
+    futuro['mes_sin'] = np.sin(2 * np.pi * futuro['mes'] / 12)
+    futuro['mes_cos'] = np.cos(2 * np.pi * futuro['mes'] / 12)
+    return futuro
+
+
+def predecir(model, futuro):
+    predicciones = model.predict(futuro[COLUMNAS_MODELO])
+    return [
+        {"mes": f"{row.mes}-{row.año}", "ventas": round(float(pred), 2)}
+        for row, pred in zip(futuro.itertuples(index=False), predicciones)
+    ]
+
+
+def valores_por_hoja(model):
+    """
+    Matriz ``árboles x nodos`` con el valor de cada nodo de cada árbol del
+    bosque, rellenada con ceros. Se calcula una vez por modelo en memoria.
+    """
+    valores = getattr(model, 'valores_hojas', None)
+    if valores is None:
+        arboles = [estimador.tree_ for estimador in model.estimators_]
+        valores = np.zeros((len(arboles), max(arbol.node_count for arbol in arboles)))
+        for i, arbol in enumerate(arboles):
+            valores[i, :arbol.node_count] = arbol.value[:, 0, 0]
+        model.valores_hojas = valores
+    return valores
+
+
+def predecir_con_intervalos(model, futuro, percentiles=(10, 50, 90)):
+    """
+    Como ``predecir`` pero con las bandas p10/p50/p90 de las predicciones de
+    todos los árboles: ``apply`` da la hoja de cada árbol para cada mes y un
+    solo indexado sobre ``valores_por_hoja`` arma la matriz meses x árboles.
+    """
+    X = futuro[COLUMNAS_MODELO]
+    hojas = model.apply(X)
+    valores = valores_por_hoja(model)
+    por_arbol = valores[np.arange(valores.shape[0]), hojas]
+    bandas = np.percentile(por_arbol, percentiles, axis=1)
+
+    return [
+        {
+            "mes": f"{row.mes}-{row.año}",
+            "ventas": round(float(media), 2),
+            **{f"p{p}": round(float(banda), 2) for p, banda in zip(percentiles, bandas[:, i])},
+        }
+        for i, (row, media) in enumerate(zip(futuro.itertuples(index=False), por_arbol.mean(axis=1)))
+    ]
+
+
+def historico(data):
+    return [
+        {"mes": f"{row.mes}-{row.año}", "ventas": float(row.total_ventas)}
+        for row in data.itertuples(index=False)
+    ]
@@ -0,0 +1,92 @@
+"""
+Registro en memoria del modelo de predicción de ventas.
+
+Cada proceso (worker de gunicorn) deserializa el modelo una sola vez y lo
+reutiliza mientras no se publique otra versión: la firma ``(inodo, mtime,
+tamaño)`` de ``actual.json`` y del artefacto invalida la copia en memoria.
+Si todavía no hay versiones publicadas se usa el ``PREDICCIONES_MODELO``
+heredado.
+"""
+import os
+import threading
+
+import joblib
+from django.conf import settings
+
+from . import artefactos
+
+_modelos = {}
+_puntero = {}
+_lock = threading.Lock()
+
+
+def _firma(ruta):
+    info = os.stat(ruta)
+    return info.st_ino, info.st_mtime_ns, info.st_size
+
+
+def version_publicada():
+    """Metadatos de la versión vigente (leídos de disco solo si cambiaron)."""
+    try:
+        firma = _firma(artefactos.ruta_puntero())
+    except FileNotFoundError:
+        return None
+
+    if _puntero.get('firma') != firma:
+        try:
+            info = artefactos.version_vigente()
+        except artefactos.VersionNoEncontrada:
+            info = None
+        _puntero.update(firma=firma, info=info)
+    return _puntero['info']
+
+
+def ruta_modelo():
+    info = version_publicada()
+    if info is None:
+        return str(settings.PREDICCIONES_MODELO)
+    return artefactos.ruta_modelo(info['version'])
+
+
+def version_modelo():
+    """Identificador de la versión vigente, sin deserializar el modelo."""
+    info = version_publicada()
+    if info is not None:
+        return info['version']
+    try:
+        return 'legado-%d' % _firma(str(settings.PREDICCIONES_MODELO))[1]
+    except FileNotFoundError:
+        return 'ninguno'
+
+
+def cargar_modelo(ruta=None):
+    """
+    Devuelve el modelo vigente (o el guardado en ``ruta``), o ``None`` si no
+    existe. Solo lee el disco si el archivo cambió.
+    """
+    ruta = ruta or ruta_modelo()
+    try:
+        firma = _firma(ruta)
+    except FileNotFoundError:
+        return None
+
+    en_memoria = _modelos.get(ruta)
+    if en_memoria and en_memoria[0] == firma:
+        return en_memoria[1]
+
+    with _lock:
+        en_memoria = _modelos.get(ruta)
+        if en_memoria and en_memoria[0] == firma:
+            return en_memoria[1]
+        modelo = joblib.load(ruta, mmap_mode=settings.PREDICCIONES_MMAP_MODE or None)
+        # Un worker solo necesita la versión vigente
+        _modelos.clear()
+        _modelos[ruta] = (firma, modelo)
+        return modelo
+
+
+def limpiar():
+    """Descarta los modelos en memoria (útil en tests)."""
+    with _lock:
+        _modelos.clear()
+        _puntero.clear()
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import VentasHistoricas, PrediccionesVentas, VentasHistoricoYPredicciones
+from .views import VentasHistoricas, PrediccionesVentas, VentasHistoricoYPredicciones, DemandaProducto
 
 urlpatterns = [
     # Ventas históricas por mes
@@ -10,4 +10,7 @@ urlpatterns = [
 
     # Histórico + predicciones combinadas
     path('ventas-historico-predicciones/', VentasHistoricoYPredicciones.as_view(), name='ventas-historico-predicciones'),
+
+    # Demanda mensual pronosticada por producto
+    path('predicciones/productos/<int:producto_id>/', DemandaProducto.as_view(), name='demanda-producto'),
 ]
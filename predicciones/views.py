@@ -1,20 +1,35 @@
 # views.py
-import joblib
-import pandas as pd
-import numpy as np
-import os
-from sklearn.ensemble import RandomForestRegressor
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from venta.models import Venta
+from venta.models import VentaDiaria
 from django.db.models import Sum
+from django.shortcuts import get_object_or_404
+
+from producto.models import Producto
+
+from . import cache
+from .pronostico import (
+    meses_solicitados, serie_mensual, meses_futuros, predecir, predecir_con_intervalos, historico
+)
+from .models import PrediccionProducto
+from .registro import cargar_modelo
+
+MODELO_NO_DISPONIBLE = {
+    "error": "El modelo de predicción aún no fue entrenado. "
+             "Ejecute 'python manage.py entrenar_modelo_ventas'."
+}
 
 
 class VentasHistoricas(APIView):
     def get(self, request):
+        clave = cache.clave_respuesta('ventas-historicas')
+        data = cache.obtener(clave)
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+
         # Obtener las ventas por período (por ejemplo, por mes)
-        ventas = Venta.objects.values('fecha__month', 'fecha__year').annotate(
+        ventas = VentaDiaria.objects.values('fecha__month', 'fecha__year').annotate(
             total_ventas=Sum('total')
         ).order_by('fecha__year', 'fecha__month')
 
@@ -23,6 +38,7 @@ class VentasHistoricas(APIView):
             'mes': f"{venta['fecha__month']}-{venta['fecha__year']}",
             'total_ventas': float(venta['total_ventas'])
         } for venta in ventas]
+        cache.guardar(clave, data)
 
         return Response(data, status=status.HTTP_200_OK)
 
@@ -30,210 +46,89 @@ class VentasHistoricas(APIView):
 class PrediccionesVentas(APIView):
     def get(self, request):
         # Cuántos meses predecir (opcional, default 6)
-        try:
-            meses_a_predecir = int(request.query_params.get('meses', 6))
-            if meses_a_predecir < 1:
-                meses_a_predecir = 6
-        except:
-            meses_a_predecir = 6
-
-        # Obtener ventas históricas
-        ventas = (
-            Venta.objects.values('fecha__year', 'fecha__month')
-            .annotate(total_ventas=Sum('total'))
-            .order_by('fecha__year', 'fecha__month')
-        )
-        
-        if not ventas:
+        meses_a_predecir = meses_solicitados(request)
+
+        # Misma versión de modelo, mismas ventas y mismo horizonte: misma respuesta
+        clave = cache.clave_respuesta('predicciones-ventas', meses_a_predecir)
+        prediccion_data = cache.obtener(clave)
+        if prediccion_data is not None:
+            return Response(prediccion_data, status=200)
+
+        # Obtener ventas históricas por mes
+        data = serie_mensual()
+        if data is None:
             return Response({"error": "No hay datos históricos de ventas."}, status=400)
 
-        # Convertir a DataFrame
-        data = pd.DataFrame(list(ventas))
-        data.rename(columns={'fecha__year': 'año', 'fecha__month': 'mes'}, inplace=True)
-
-        # Crear variable temporal continua
-        primer_año = data['año'].min()
-        primer_mes = data['mes'].min()
-        
-        data['meses_desde_inicio'] = (data['año'] - primer_año) * 12 + (data['mes'] - primer_mes)
-        data['mes_sin'] = np.sin(2 * np.pi * data['mes'] / 12)
-        data['mes_cos'] = np.cos(2 * np.pi * data['mes'] / 12)
-
-        X = data[['meses_desde_inicio', 'mes_sin', 'mes_cos']]
-        y = data['total_ventas']
-
-        modelo_path = 'modelo_ventas.pkl'
-
-        # Usar modelo existente o entrenar
-        if os.path.exists(modelo_path):
-            model = joblib.load(modelo_path)
-            
-            ultimo_mes_modelo = getattr(model, 'ultimo_mes', None)
-            ultimo_año_modelo = getattr(model, 'ultimo_año', None)
-            ultimo_mes_data = data['mes'].max()
-            ultimo_año_data = data['año'].max()
-            
-            primer_año = getattr(model, 'primer_año', primer_año)
-            primer_mes = getattr(model, 'primer_mes', primer_mes)
-            
-            if (ultimo_mes_modelo != ultimo_mes_data) or (ultimo_año_modelo != ultimo_año_data):
-                model = RandomForestRegressor(n_estimators=100, random_state=42)
-                model.fit(X, y)
-                model.ultimo_mes = ultimo_mes_data
-                model.ultimo_año = ultimo_año_data
-                model.primer_año = primer_año
-                model.primer_mes = primer_mes
-                joblib.dump(model, modelo_path)
-        else:
-            model = RandomForestRegressor(n_estimators=100, random_state=42)
-            model.fit(X, y)
-            model.ultimo_mes = data['mes'].max()
-            model.ultimo_año = data['año'].max()
-            model.primer_año = primer_año
-            model.primer_mes = primer_mes
-            joblib.dump(model, modelo_path)
-
-        # Preparar fechas futuras DESDE EL ÚLTIMO MES
-        ultimo_año = data['año'].max()
-        ultimo_mes = data['mes'].max()
-        ultimo_meses_desde_inicio = data['meses_desde_inicio'].max()
-        
-        future_dates = []
-        mes_actual = ultimo_mes
-        año_actual = ultimo_año
-        meses_desde_inicio_actual = ultimo_meses_desde_inicio
-        
-        for i in range(1, meses_a_predecir + 1):
-            mes_actual += 1
-            meses_desde_inicio_actual += 1
-            
-            if mes_actual > 12:
-                mes_actual = 1
-                año_actual += 1
-            
-            future_dates.append({
-                'año': año_actual,
-                'mes': mes_actual,
-                'meses_desde_inicio': meses_desde_inicio_actual,
-                'mes_sin': np.sin(2 * np.pi * mes_actual / 12),
-                'mes_cos': np.cos(2 * np.pi * mes_actual / 12)
-            })
-        
-        future_df = pd.DataFrame(future_dates)
-        X_future = future_df[['meses_desde_inicio', 'mes_sin', 'mes_cos']]
-        predictions = model.predict(X_future)
-
-        prediccion_data = [
-            {"mes": f"{row.mes}-{row.año}", "ventas": round(float(pred), 2)}
-            for row, pred in zip(future_df.itertuples(index=False), predictions)
-        ]
+        # Último modelo publicado (lo entrena el comando entrenar_modelo_ventas)
+        model = cargar_modelo()
+        if model is None:
+            return Response(MODELO_NO_DISPONIBLE, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        # Predecir DESDE EL ÚLTIMO MES
+        prediccion_data = predecir(model, meses_futuros(data, meses_a_predecir))
+        cache.guardar(clave, prediccion_data)
 
         return Response(prediccion_data, status=200)
 
 
 class VentasHistoricoYPredicciones(APIView):
+    """
+    ?meses=N        meses a predecir (default 6)
+    ?intervalos=true agrega las bandas p10/p50/p90 de los árboles del bosque
+    """
+
     def get(self, request):
-        try:
-            meses_a_predecir = int(request.query_params.get('meses', 6))
-            if meses_a_predecir < 1:
-                meses_a_predecir = 6
-        except:
-            meses_a_predecir = 6
-
-        ventas = (
-            Venta.objects.values('fecha__year', 'fecha__month')
-            .annotate(total_ventas=Sum('total'))
-            .order_by('fecha__year', 'fecha__month')
-        )
+        meses_a_predecir = meses_solicitados(request)
+        intervalos = request.query_params.get('intervalos', '').lower() in ('true', '1')
 
-        if not ventas:
+        clave = cache.clave_respuesta('ventas-historico-predicciones', meses_a_predecir, intervalos)
+        resultado = cache.obtener(clave)
+        if resultado is not None:
+            return Response(resultado, status=status.HTTP_200_OK)
+
+        data = serie_mensual()
+        if data is None:
             return Response({"error": "No hay datos históricos de ventas."}, status=400)
 
-        data = pd.DataFrame(list(ventas))
-        data.rename(columns={'fecha__year': 'año', 'fecha__month': 'mes'}, inplace=True)
-
-        # Crear variable temporal continua
-        primer_año = data['año'].min()
-        primer_mes = data['mes'].min()
-        
-        data['meses_desde_inicio'] = (data['año'] - primer_año) * 12 + (data['mes'] - primer_mes)
-        data['mes_sin'] = np.sin(2 * np.pi * data['mes'] / 12)
-        data['mes_cos'] = np.cos(2 * np.pi * data['mes'] / 12)
-
-        X = data[['meses_desde_inicio', 'mes_sin', 'mes_cos']]
-        y = data['total_ventas']
-
-        modelo_path = 'modelo_ventas.pkl'
-
-        actualizar_modelo = False
-        if os.path.exists(modelo_path):
-            model = joblib.load(modelo_path)
-            
-            ultimo_mes_modelo = getattr(model, 'ultimo_mes', None)
-            ultimo_año_modelo = getattr(model, 'ultimo_año', None)
-            ultimo_mes_data = data['mes'].max()
-            ultimo_año_data = data['año'].max()
-            
-            primer_año = getattr(model, 'primer_año', primer_año)
-            primer_mes = getattr(model, 'primer_mes', primer_mes)
-            
-            if (ultimo_mes_modelo != ultimo_mes_data) or (ultimo_año_modelo != ultimo_año_data):
-                actualizar_modelo = True
+        model = cargar_modelo()
+        if model is None:
+            return Response(MODELO_NO_DISPONIBLE, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        futuro = meses_futuros(data, meses_a_predecir)
+        if intervalos and hasattr(model, 'estimators_'):
+            predicciones = predecir_con_intervalos(model, futuro)
         else:
-            actualizar_modelo = True
-
-        if actualizar_modelo:
-            model = RandomForestRegressor(n_estimators=100, random_state=42)
-            model.fit(X, y)
-            model.ultimo_mes = data['mes'].max()
-            model.ultimo_año = data['año'].max()
-            model.primer_año = primer_año
-            model.primer_mes = primer_mes
-            joblib.dump(model, modelo_path)
-
-        # Preparar fechas futuras
-        ultimo_año = data['año'].max()
-        ultimo_mes = data['mes'].max()
-        ultimo_meses_desde_inicio = data['meses_desde_inicio'].max()
-        
-        future_dates = []
-        mes_actual = ultimo_mes
-        año_actual = ultimo_año
-        meses_desde_inicio_actual = ultimo_meses_desde_inicio
-        
-        for i in range(1, meses_a_predecir + 1):
-            mes_actual += 1
-            meses_desde_inicio_actual += 1
-            
-            if mes_actual > 12:
-                mes_actual = 1
-                año_actual += 1
-            
-            future_dates.append({
-                'año': año_actual,
-                'mes': mes_actual,
-                'meses_desde_inicio': meses_desde_inicio_actual,
-                'mes_sin': np.sin(2 * np.pi * mes_actual / 12),
-                'mes_cos': np.cos(2 * np.pi * mes_actual / 12)
-            })
-        
-        future_df = pd.DataFrame(future_dates)
-        X_future = future_df[['meses_desde_inicio', 'mes_sin', 'mes_cos']]
-        predictions = model.predict(X_future)
-
-        historico_data = [
-            {"mes": f"{row.mes}-{row.año}", "ventas": float(row.total_ventas)}
-            for row in data.itertuples(index=False)
-        ]
-
-        prediccion_data = [
-            {"mes": f"{row.mes}-{row.año}", "ventas": round(float(pred), 2)}
-            for row, pred in zip(future_df.itertuples(index=False), predictions)
-        ]
+            predicciones = predecir(model, futuro)
 
         resultado = {
-            "historico": historico_data,
-            "predicciones": prediccion_data
+            "historico": historico(data),
+            "predicciones": predicciones
         }
+        cache.guardar(clave, resultado)
 
-        return Response(resultado, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(resultado, status=status.HTTP_200_OK)
+
+
+class DemandaProducto(APIView):
+    """Demanda mensual pronosticada de un producto (ver comando predecir_demanda_productos)."""
+
+    def get(self, request, producto_id):
+        producto = get_object_or_404(Producto, id=producto_id)
+        predicciones = list(
+            PrediccionProducto.objects.filter(producto=producto).order_by('mes')
+        )
+        if not predicciones:
+            return Response(
+                {"error": "No hay pronóstico de demanda para este producto."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response({
+            "producto_id": producto.id,
+            "producto": producto.nombre,
+            "generado_en": predicciones[0].generado_en,
+            "predicciones": [
+                {"mes": f"{p.mes.month}-{p.mes.year}", "unidades": p.unidades}
+                for p in predicciones
+            ]
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,106 @@
+"""
+Proyección de días hasta agotar stock para todo el catálogo.
+
+Las unidades vendidas por producto y día se leen con una consulta agrupada y
+se pivotean a una matriz ``productos x días``; la velocidad de venta es una
+media ponderada exponencialmente (vida media ``VIDA_MEDIA_DIAS``), calculada
+para todos los productos con un único producto matriz-vector.
+"""
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.db.models import DateField, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from venta.models import DetalleVenta
+from .models import Producto, ProyeccionAgotamiento
+
+VENTANA_DIAS = 90
+VIDA_MEDIA_DIAS = 14
+DIAS_RIESGO = 14
+
+
+def pesos_exponenciales(dias, vida_media=VIDA_MEDIA_DIAS):
+    """Pesos normalizados para ``dias`` días, del más antiguo al más reciente."""
+    antiguedad = np.arange(dias - 1, -1, -1)
+    pesos = 0.5 ** (antiguedad / vida_media)
+    return pesos / pesos.sum()
+
+
+def velocidades(producto_ids, hoy, ventana=VENTANA_DIAS, vida_media=VIDA_MEDIA_DIAS):
+    """Unidades/día (media exponencial) de cada producto en ``producto_ids``."""
+    desde = hoy - timedelta(days=ventana - 1)
+    filas = (
+        DetalleVenta.objects.exclude(venta__estado='cancelado')
+        .filter(venta__fecha__gte=timezone.make_aware(datetime.combine(desde, time.min)))
+        .annotate(dia=TruncDate('venta__fecha', output_field=DateField()))
+        .filter(dia__lte=hoy)
+        .values('producto_id', 'dia')
+        .annotate(unidades=Sum('cantidad'))
+        .order_by()
+    )
+    ventas = pd.DataFrame.from_records(filas.iterator(), columns=['producto_id', 'dia', 'unidades'])
+    if ventas.empty:
+        return np.zeros(len(producto_ids))
+
+    dias = pd.date_range(desde, hoy, freq='D')
+    matriz = (
+        ventas.assign(dia=pd.to_datetime(ventas['dia']))
+        .pivot_table(index='producto_id', columns='dia', values='unidades',
+                     aggfunc='sum', fill_value=0)
+        .reindex(index=producto_ids, columns=dias, fill_value=0)
+        .to_numpy(dtype=np.float64)
+    )
+    return matriz @ pesos_exponenciales(len(dias), vida_media)
+
+
+def proyectar_agotamiento(ventana=VENTANA_DIAS, vida_media=VIDA_MEDIA_DIAS):
+    """Recalcula ``ProyeccionAgotamiento`` para todos los productos activos."""
+    hoy = timezone.localdate()
+    productos = pd.DataFrame.from_records(
+        Producto.objects.filter(estado=True).order_by('id').values_list('id', 'stock').iterator(),
+        columns=['id', 'stock'],
+    )
+    if productos.empty:
+        ProyeccionAgotamiento.objects.all().delete()
+        return 0
+
+    producto_ids = productos['id'].to_numpy()
+    stock = productos['stock'].to_numpy(dtype=np.float64)
+    velocidad = velocidades(producto_ids, hoy, ventana, vida_media)
+
+    con_ventas = velocidad > 0
+    dias = np.full(len(stock), np.nan)
+    dias[con_ventas] = stock[con_ventas] / velocidad[con_ventas]
+
+    calculado_en = timezone.now()
+    with transaction.atomic():
+        ProyeccionAgotamiento.objects.all().delete()
+        ProyeccionAgotamiento.objects.bulk_create(
+            (
+                ProyeccionAgotamiento(
+                    producto_id=int(producto_id),
+                    stock=int(unidades),
+                    velocidad_diaria=round(float(v), 4),
+                    dias_hasta_agotamiento=None if np.isnan(d) else round(float(d), 1),
+                    fecha_agotamiento=None if np.isnan(d) else hoy + timedelta(days=int(d)),
+                    calculado_en=calculado_en,
+                )
+                for producto_id, unidades, v, d in zip(producto_ids, stock, velocidad, dias)
+            ),
+            batch_size=5000,
+        )
+    return len(producto_ids)
+
+
+def en_riesgo(dias=DIAS_RIESGO):
+    """Proyecciones que se agotan dentro de ``dias`` días, las más urgentes primero."""
+    limite = timezone.localdate() + timedelta(days=dias)
+    return (
+        ProyeccionAgotamiento.objects.filter(fecha_agotamiento__lte=limite)
+        .select_related('producto')
+        .order_by('fecha_agotamiento', 'producto_id')
+    )
@@ -0,0 +1,28 @@
+"""
+Recalcula la velocidad de venta y la fecha estimada de agotamiento de cada producto.
+
+Uso:
+    python manage.py proyectar_agotamiento --ventana 90 --vida-media 14
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from producto.agotamiento import proyectar_agotamiento, VENTANA_DIAS, VIDA_MEDIA_DIAS
+
+
+class Command(BaseCommand):
+    help = "Proyecta los días hasta agotar stock de todos los productos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ventana', type=int, default=VENTANA_DIAS,
+                            help=f"Días de historia a considerar (default: {VENTANA_DIAS})")
+        parser.add_argument('--vida-media', type=float, default=VIDA_MEDIA_DIAS,
+                            help=f"Vida media de la media exponencial en días (default: {VIDA_MEDIA_DIAS})")
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        total = proyectar_agotamiento(options['ventana'], options['vida_media'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {total} productos proyectados en {time.perf_counter() - inicio:.2f}s"
+        ))
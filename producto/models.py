@@ -16,6 +16,8 @@ class Producto(models.Model):
     imagen = models.URLField(blank=True, null=True)
     estado = models.BooleanField(default=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Los .update() masivos deben asignarlo explícitamente (marca de agua de reportes)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
 
     # Atributos para el descuento
     descuento = models.DecimalField(
@@ -53,6 +55,20 @@ class Producto(models.Model):
         super().save(*args, **kwargs)
 
 
+class ProyeccionAgotamiento(models.Model):
+    """
+    Velocidad de venta y fecha estimada de agotamiento de cada producto.
+    La recalcula el comando ``proyectar_agotamiento`` (ver producto.agotamiento).
+    """
+    producto = models.OneToOneField(
+        Producto, on_delete=models.CASCADE, primary_key=True, related_name="proyeccion_agotamiento"
+    )
+    stock = models.PositiveIntegerField()
+    velocidad_diaria = models.FloatField()  # unidades/día, media exponencial
+    dias_hasta_agotamiento = models.FloatField(null=True, blank=True)  # None: sin ventas recientes
+    fecha_agotamiento = models.DateField(null=True, blank=True, db_index=True)
+    calculado_en = models.DateTimeField()
 
-
+    def __str__(self):
+        return f"{self.producto_id} - {self.fecha_agotamiento or 'sin ventas'}"
 
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Producto
+from .models import Producto, ProyeccionAgotamiento
 
 class ProductoSerializer(serializers.ModelSerializer):
     marca_nombre = serializers.CharField(source="marca.nombre", read_only=True)
@@ -29,3 +29,20 @@ class ProductoSerializer(serializers.ModelSerializer):
             "fecha_inicio_descuento",  # Agregar fecha de inicio del descuento
             "fecha_fin_descuento",  # Agregar fecha de fin del descuento
         ]
+
+
+class ProyeccionAgotamientoSerializer(serializers.ModelSerializer):
+    producto_nombre = serializers.CharField(source="producto.nombre", read_only=True)
+
+    class Meta:
+        model = ProyeccionAgotamiento
+        fields = [
+            "producto",
+            "producto_nombre",
+            "stock",
+            "velocidad_diaria",
+            "dias_hasta_agotamiento",
+            "fecha_agotamiento",
+            "calculado_en",
+        ]
+
@@ -1,7 +1,10 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import ProductoViewSet
+from .views import ProductoViewSet, AgotamientoView
 
 router = DefaultRouter()
 router.register(r'productos', ProductoViewSet, basename='producto')
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path('inventario/agotamiento/', AgotamientoView.as_view(), name='inventario-agotamiento'),
+]
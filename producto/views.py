@@ -1,9 +1,11 @@
-from rest_framework import viewsets, filters
+from django.db.models import F
+from rest_framework import viewsets, filters, generics
 from rest_framework.permissions import AllowAny
 from bitacora.models import Bitacora
 from users.views import get_client_ip
-from .models import Producto
-from .serializers import ProductoSerializer
+from .agotamiento import en_riesgo
+from .models import Producto, ProyeccionAgotamiento
+from .serializers import ProductoSerializer, ProyeccionAgotamientoSerializer
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
 
@@ -73,4 +75,25 @@ class ProductoViewSet(viewsets.ModelViewSet):
         # Retornar el producto actualizado
         serializer = ProductoSerializer(producto)
         return Response(serializer.data, status=status.HTTP_200_OK)
-    
\ No newline at end of file
+
+
+class AgotamientoView(generics.ListAPIView):
+    """
+    Proyección de agotamiento de stock por producto.
+    GET /api/inventario/agotamiento/           todos, los que se agotan antes primero
+    GET /api/inventario/agotamiento/?dias=14   solo los que se agotan en 14 días o menos
+    """
+    serializer_class = ProyeccionAgotamientoSerializer
+    filter_backends = []
+
+    def get_queryset(self):
+        dias = self.request.query_params.get('dias')
+        if dias is not None:
+            try:
+                return en_riesgo(int(dias))
+            except ValueError:
+                pass
+        return ProyeccionAgotamiento.objects.select_related('producto').order_by(
+            F('fecha_agotamiento').asc(nulls_last=True), 'producto_id'
+        )
+
@@ -0,0 +1,265 @@
+"""
+Generación de reportes fuera del request.
+
+``ReporteViewSet.generar`` solo crea el ``Reporte`` en estado ``en_cola``; el
+comando ``procesar_reportes`` reclama los trabajos pendientes y los renderiza
+(datos + PDF/Excel/JSON) en un pool de procesos.
+
+Cada reporte lleva una ``huella``: hash de sus parámetros normalizados y de la
+marca de agua de los datos que usa. Dos pedidos con la misma huella comparten
+el mismo archivo en lugar de renderizarlo otra vez.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile, File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+
+from producto.models import Producto, ProyeccionAgotamiento
+from venta.models import Venta
+from .models import Reporte
+from .utils import (
+    serializar_json,
+    generar_reporte_ventas_pdf,
+    generar_reporte_ventas_excel,
+    generar_datos_reporte_ventas,
+    generar_reporte_productos_pdf,
+    generar_reporte_productos_excel,
+    generar_reporte_clientes_pdf,
+    generar_reporte_clientes_excel,
+    generar_reporte_inventario_pdf,
+    generar_reporte_inventario_excel,
+    generar_reporte_financiero_pdf,
+    generar_reporte_financiero_excel,
+)
+
+MAX_INTENTOS = 3
+# Un reporte que sigue en 'procesando' pasado este tiempo se da por abandonado
+# (el proceso del pool murió) y se vuelve a reclamar
+TIEMPO_MAXIMO_PROCESANDO = timedelta(minutes=15)
+
+EXTENSIONES = {'pdf': 'pdf', 'excel': 'xlsx', 'json': 'json'}
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'json': 'application/json',
+}
+
+
+def generar_datos(tipo, fecha_inicio=None, fecha_fin=None, detalle_completo=False):
+    """Datos del reporte ``tipo`` (mismos que usan las vistas de reportes)."""
+    from .views import ReporteViewSet
+
+    if tipo == 'ventas':
+        return generar_datos_reporte_ventas(fecha_inicio, fecha_fin, detalle_completo)
+
+    viewset = ReporteViewSet()
+    if tipo == 'productos':
+        return viewset._generar_datos_productos()
+    if tipo == 'clientes':
+        return viewset._generar_datos_clientes()
+    if tipo == 'inventario':
+        return viewset._generar_datos_inventario()
+    if tipo == 'financiero':
+        return viewset._generar_datos_financiero(fecha_inicio, fecha_fin)
+    raise ValueError(f"Tipo de reporte no soportado: {tipo}")
+
+
+def renderizar(tipo, formato, datos, fecha_inicio=None, fecha_fin=None, incluir_graficos=True):
+    """Devuelve el contenido del archivo (``bytes`` o buffer) en el formato pedido."""
+    if formato == 'json':
+        return json.dumps(datos, indent=2, ensure_ascii=False, default=serializar_json).encode('utf-8')
+
+    if formato == 'pdf':
+        if tipo == 'ventas':
+            return generar_reporte_ventas_pdf(datos, fecha_inicio, fecha_fin)
+        if tipo == 'productos':
+            return generar_reporte_productos_pdf(datos)
+        if tipo == 'clientes':
+            return generar_reporte_clientes_pdf(datos)
+        if tipo == 'inventario':
+            return generar_reporte_inventario_pdf(datos)
+        if tipo == 'financiero':
+            return generar_reporte_financiero_pdf(datos, incluir_graficos=incluir_graficos)
+
+    if formato == 'excel':
+        if tipo == 'ventas':
+            return generar_reporte_ventas_excel(datos, fecha_inicio, fecha_fin)
+        if tipo == 'productos':
+            return generar_reporte_productos_excel(datos)
+        if tipo == 'clientes':
+            return generar_reporte_clientes_excel(datos, incluir_graficos=incluir_graficos)
+        if tipo == 'inventario':
+            return generar_reporte_inventario_excel(datos, incluir_graficos=incluir_graficos)
+        if tipo == 'financiero':
+            return generar_reporte_financiero_excel(datos, incluir_graficos=incluir_graficos)
+
+    raise ValueError(f"Formato {formato} no soportado para reportes de {tipo}")
+
+
+def nombre_archivo(tipo, formato):
+    return f"reporte_{tipo}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{EXTENSIONES[formato]}"
+
+
+def _marca(queryset, campo):
+    return queryset.aggregate(cantidad=Count('pk'), ultimo=Max(campo))
+
+
+def marca_de_datos(tipo):
+    """
+    Estado de las tablas que alimentan el reporte ``tipo``: cantidad de filas
+    y último cambio. Cualquier alta, baja o modificación cambia la marca.
+    """
+    if tipo in ('ventas', 'financiero'):
+        return {'ventas': _marca(Venta.objects.all(), 'fecha_actualizacion')}
+    if tipo == 'productos':
+        return {'productos': _marca(Producto.objects.all(), 'fecha_actualizacion')}
+    if tipo == 'inventario':
+        return {
+            'productos': _marca(Producto.objects.all(), 'fecha_actualizacion'),
+            'agotamiento': _marca(ProyeccionAgotamiento.objects.all(), 'calculado_en'),
+        }
+    if tipo == 'clientes':
+        return {
+            'ventas': _marca(Venta.objects.all(), 'fecha_actualizacion'),
+            'clientes': _marca(
+                get_user_model().objects.filter(rol__nombre__iexact='Cliente'),
+                'fecha_actualizacion',
+            ),
+        }
+    return {}
+
+
+def huella_reporte(tipo, formato, fecha_inicio=None, fecha_fin=None,
+                   incluir_graficos=True, agrupar_por='', detalle_completo=False):
+    """Hash SHA-256 de los parámetros normalizados más la marca de agua de datos."""
+    clave = {
+        'tipo': tipo,
+        'formato': formato,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'incluir_graficos': bool(incluir_graficos),
+        'agrupar_por': (agrupar_por or '').strip().lower(),
+        'detalle_completo': bool(detalle_completo),
+        'datos': marca_de_datos(tipo),
+    }
+    texto = json.dumps(clave, cls=DjangoJSONEncoder, sort_keys=True)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def reporte_en_cache(huella, excluir=None):
+    """Último reporte listo con la misma huella y cuyo archivo sigue existiendo."""
+    if not huella:
+        return None
+    candidatos = Reporte.objects.filter(huella=huella, estado='listo').exclude(archivo='')
+    if excluir:
+        candidatos = candidatos.exclude(id=excluir)
+    for reporte in candidatos.order_by('-id')[:3]:
+        if reporte.archivo.storage.exists(reporte.archivo.name):
+            return reporte
+    return None
+
+
+def reclamar_pendientes(lote=10):
+    """
+    Marca como ``procesando`` hasta ``lote`` reportes en cola y devuelve sus ids.
+    ``skip_locked`` permite correr varios workers sin que tomen el mismo reporte.
+
+    También reclama los reportes abandonados en ``procesando`` por más de
+    ``TIEMPO_MAXIMO_PROCESANDO``; los que ya agotaron ``MAX_INTENTOS`` pasan a
+    ``fallido``.
+
+    Solo se reclama un reporte por huella: los duplicados quedan en cola y
+    ``procesar_reporte`` los apunta al archivo del primero cuando termina.
+    """
+    ahora = timezone.now()
+    abandonados = Q(estado='procesando', fecha_reclamo__lt=ahora - TIEMPO_MAXIMO_PROCESANDO)
+
+    with transaction.atomic():
+        Reporte.objects.filter(abandonados, intentos__gte=MAX_INTENTOS).update(
+            estado='fallido',
+            error='El worker no terminó de generar el reporte',
+            fecha_finalizacion=ahora,
+        )
+        en_proceso = (
+            Reporte.objects.filter(estado='procesando', fecha_reclamo__gte=ahora - TIEMPO_MAXIMO_PROCESANDO)
+            .exclude(huella='')
+            .values('huella')
+        )
+        candidatos = (
+            Reporte.objects.select_for_update(skip_locked=True)
+            .filter(Q(estado='en_cola') | abandonados)
+            .exclude(huella__in=en_proceso)
+            .order_by('id')
+            .values_list('id', 'huella')
+        )
+
+        ids, huellas = [], set()
+        for reporte_id, huella in candidatos.iterator(chunk_size=lote * 4):
+            if huella and huella in huellas:
+                continue
+            huellas.add(huella)
+            ids.append(reporte_id)
+            if len(ids) == lote:
+                break
+        if ids:
+            Reporte.objects.filter(id__in=ids).update(
+                estado='procesando', fecha_reclamo=ahora, intentos=F('intentos') + 1
+            )
+    return ids
+
+
+def procesar_reporte(reporte_id):
+    """Genera y guarda el archivo de un reporte reclamado. Devuelve el estado final."""
+    reporte = Reporte.objects.get(id=reporte_id)
+
+    # Otro trabajo con la misma huella pudo terminar mientras este esperaba
+    existente = reporte_en_cache(reporte.huella, excluir=reporte.id)
+    if existente:
+        reporte.archivo.name = existente.archivo.name
+        reporte.estado = 'listo'
+        reporte.error = None
+        reporte.fecha_finalizacion = timezone.now()
+        reporte.save(update_fields=['archivo', 'estado', 'error', 'fecha_finalizacion'])
+        return reporte.estado
+
+    try:
+        incluir_graficos = reporte.parametros.get('incluir_graficos', True)
+        datos = generar_datos(
+            reporte.tipo, reporte.fecha_inicio, reporte.fecha_fin,
+            reporte.parametros.get('detalle_completo', False),
+        )
+        contenido = renderizar(
+            reporte.tipo, reporte.formato, datos,
+            reporte.fecha_inicio, reporte.fecha_fin, incluir_graficos,
+        )
+        # Los Excel llegan como archivo temporal: se copian al storage por bloques
+        archivo = ContentFile(contenido) if isinstance(contenido, bytes) else File(contenido)
+        with archivo:
+            reporte.archivo.save(
+                nombre_archivo(reporte.tipo, reporte.formato), archivo, save=False
+            )
+        reporte.estado = 'listo'
+        reporte.error = None
+    except Exception as e:
+        reporte.estado = 'fallido'
+        reporte.error = str(e)
+
+    reporte.fecha_finalizacion = timezone.now()
+    reporte.save(update_fields=['archivo', 'estado', 'error', 'fecha_finalizacion'])
+
+    if reporte.estado == 'listo' and reporte.huella:
+        # Los duplicados que esperaban en cola comparten el archivo recién generado
+        Reporte.objects.filter(huella=reporte.huella, estado='en_cola').update(
+            archivo=reporte.archivo.name,
+            estado='listo',
+            error=None,
+            fecha_finalizacion=reporte.fecha_finalizacion,
+        )
+    return reporte.estado
@@ -0,0 +1,127 @@
+"""
+Benchmark de los datos del reporte de clientes con 1k, 10k y 100k clientes.
+
+Compara tres formas de obtener compras y total gastado por cliente:
+    - por_cliente: implementación anterior, aggregate() + count() por cliente
+    - anotada:     una consulta con Count/Sum(filter=Q(venta__estado='pagado'))
+    - resumen:     la implementación actual, que lee ResumenCliente (conteo + filas por bloques)
+
+Uso:
+    python manage.py benchmark_reporte_clientes
+    python manage.py benchmark_reporte_clientes --clientes 1000 10000 100000 --max-por-cliente 10000
+
+Todos los datos se crean dentro de una transacción que se revierte al final.
+"""
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+
+from reporte.views import ReporteViewSet
+from roles.models import Rol
+from venta.models import Venta
+from venta.resumenes import reconstruir_resumen_clientes
+
+
+def datos_por_cliente():
+    """Reproduce el flujo anterior: dos consultas por cliente."""
+    clientes = get_user_model().objects.filter(rol__nombre__iexact="Cliente")
+    datos = []
+    for cliente in clientes:
+        ventas = Venta.objects.filter(usuario=cliente, estado="pagado")
+        total = ventas.aggregate(total=Sum("total"))["total"] or 0
+        datos.append({"id": cliente.id, "cantidad_compras": ventas.count(), "total_compras": float(total)})
+    return datos
+
+
+def datos_anotados():
+    pagadas = Q(venta__estado="pagado")
+    return [
+        {"id": c["id"], "cantidad_compras": c["compras"], "total_compras": float(c["total"] or 0)}
+        for c in get_user_model().objects.filter(rol__nombre__iexact="Cliente")
+        .annotate(compras=Count("venta", filter=pagadas), total=Sum("venta__total", filter=pagadas))
+        .order_by("id")
+        .values("id", "compras", "total")
+        .iterator(chunk_size=2000)
+    ]
+
+
+def datos_resumen():
+    # Las filas son diferidas: se recorren una vez, como al renderizar
+    return list(ReporteViewSet()._generar_datos_clientes()["clientes"])
+
+
+def _contador(consultas):
+    # CaptureQueriesContext guarda como máximo 9000 consultas; aquí solo se cuentan
+    def envoltorio(execute, sql, params, many, context):
+        consultas[0] += 1
+        return execute(sql, params, many, context)
+    return envoltorio
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Mide consultas y tiempo de los datos del reporte de clientes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', nargs='+', type=int, default=[1000, 10000, 100000],
+                            help="Cantidades de clientes a medir (default: 1000 10000 100000)")
+        parser.add_argument('--ventas-por-cliente', type=int, default=2)
+        parser.add_argument('--max-por-cliente', type=int, default=10000,
+                            help="No mide la versión por cliente por encima de este tamaño (default: 10000)")
+
+    def handle(self, *args, **options):
+        metodos = [('por_cliente', datos_por_cliente), ('anotada', datos_anotados), ('resumen', datos_resumen)]
+        self.stdout.write(f"{'clientes':>9} {'método':<12} {'consultas':>10} {'segundos':>9}")
+
+        try:
+            with transaction.atomic():
+                rol, _ = Rol.objects.get_or_create(nombre="Cliente")
+                creados = 0
+                for n in sorted(options['clientes']):
+                    self._crear_clientes(rol, n - creados, options['ventas_por_cliente'])
+                    creados = n
+                    reconstruir_resumen_clientes()
+
+                    for nombre, funcion in metodos:
+                        if nombre == 'por_cliente' and n > options['max_por_cliente']:
+                            continue
+                        consultas = [0]
+                        with connection.execute_wrapper(_contador(consultas)):
+                            inicio = time.perf_counter()
+                            filas = funcion()
+                            segundos = time.perf_counter() - inicio
+                        assert len(filas) >= n
+                        self.stdout.write(f"{n:>9} {nombre:<12} {consultas[0]:>10} {segundos:>9.3f}")
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _crear_clientes(self, rol, cantidad, ventas_por_cliente):
+        prefijo = uuid.uuid4().hex[:8]
+        usuarios = get_user_model().objects.bulk_create(
+            (
+                get_user_model()(
+                    username=f"bench_{prefijo}_{i}",
+                    email=f"bench_{prefijo}_{i}@example.com",
+                    password="!",
+                    rol=rol,
+                )
+                for i in range(cantidad)
+            ),
+            batch_size=5000,
+        )
+        Venta.objects.bulk_create(
+            (
+                Venta(usuario=usuario, total=100 + j, estado="pagado" if j % 3 else "cancelado")
+                for usuario in usuarios
+                for j in range(ventas_por_cliente)
+            ),
+            batch_size=5000,
+        )
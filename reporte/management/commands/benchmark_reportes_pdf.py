@@ -0,0 +1,109 @@
+"""
+Benchmark de los PDF de ventas y productos con muchas filas.
+
+Cada medición corre en un proceso hijo para que el pico de RSS
+(``ru_maxrss``) corresponda solo a ese renderizado. Los datos son
+sintéticos y se generan fila a fila, sin tocar la base de datos.
+
+Uso:
+    python manage.py benchmark_reportes_pdf
+    python manage.py benchmark_reportes_pdf --filas 1000 10000 100000 --reportes ventas
+"""
+import multiprocessing
+import resource
+import time
+
+from django.core.management.base import BaseCommand
+
+from reporte.utils import generar_reporte_ventas_pdf, generar_reporte_productos_pdf
+
+
+class _Filas:
+    """Filas sintéticas que se pueden recorrer varias veces sin guardarlas."""
+
+    def __init__(self, cantidad, fila):
+        self.cantidad = cantidad
+        self.fila = fila
+
+    def __iter__(self):
+        return (self.fila(i) for i in range(self.cantidad))
+
+    def __len__(self):
+        return self.cantidad
+
+    def __bool__(self):
+        return self.cantidad > 0
+
+
+def _datos_ventas(n):
+    return {
+        "total_ventas": float(n),
+        "cantidad_ventas": n,
+        "ticket_promedio": 1.0,
+        "productos_vendidos": n,
+        "ventas_detalle": _Filas(n, lambda i: {
+            "id": i,
+            "usuario": f"cliente{i % 500}",
+            "fecha": "17/10/2026 10:26",
+            "total": float(i % 1000),
+            "estado": "Pagado",
+        }),
+    }
+
+
+def _datos_productos(n):
+    return {
+        "total_productos": n,
+        "valor_inventario": float(n),
+        "productos": _Filas(n, lambda i: {
+            "id": i,
+            "nombre": f"Producto {i}",
+            "marca": "Samsung",
+            "categoria": "Audio",
+            "precio": float(i % 1000),
+            "stock": i % 50,
+        }),
+    }
+
+
+def _medir(reporte, filas, conexion):
+    antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    if reporte == 'ventas':
+        buffer = generar_reporte_ventas_pdf(_datos_ventas(filas), incluir_graficos=False)
+    else:
+        buffer = generar_reporte_productos_pdf(_datos_productos(filas))
+    segundos = time.perf_counter() - inicio
+    despues = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    conexion.send((segundos, antes / 1024, despues / 1024, len(buffer.getbuffer())))
+    conexion.close()
+
+
+class Command(BaseCommand):
+    help = "Mide tiempo y pico de RSS al generar PDF de ventas y productos con muchas filas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', nargs='+', type=int, default=[1000, 10000, 100000],
+                            help="Cantidades de filas a medir (default: 1000 10000 100000)")
+        parser.add_argument('--reportes', nargs='+', choices=['ventas', 'productos'],
+                            default=['ventas', 'productos'])
+
+    def handle(self, *args, **options):
+        contexto = multiprocessing.get_context('fork')
+        self.stdout.write(
+            f"{'reporte':<10} {'filas':>8} {'segundos':>9} {'pico RSS MB':>12} "
+            f"{'incremento MB':>14} {'PDF MB':>8}"
+        )
+
+        for reporte in options['reportes']:
+            for filas in options['filas']:
+                receptor, emisor = contexto.Pipe(duplex=False)
+                proceso = contexto.Process(target=_medir, args=(reporte, filas, emisor))
+                proceso.start()
+                emisor.close()
+                segundos, antes, despues, tamano = receptor.recv()
+                proceso.join()
+                self.stdout.write(
+                    f"{reporte:<10} {filas:>8} {segundos:>9.2f} {despues:>12.1f} "
+                    f"{despues - antes:>14.1f} {tamano / 1e6:>8.1f}"
+                )
@@ -0,0 +1,63 @@
+"""
+Worker que genera los reportes encolados por /api/reportes/generar/.
+
+Uso:
+    python manage.py procesar_reportes --procesos 2            # corre indefinidamente
+    python manage.py procesar_reportes --una-vez               # vacía la cola y termina
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from reporte.generacion import reclamar_pendientes, procesar_reporte
+
+
+def _inicializar_proceso():
+    # Con "spawn"/"forkserver" el proceso hijo arranca sin Django configurado
+    django.setup()
+
+
+def _procesar(reporte_id):
+    try:
+        return procesar_reporte(reporte_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Procesa la cola de reportes pendientes en un pool de procesos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=2,
+                            help="Procesos que renderizan reportes (default: 2)")
+        parser.add_argument('--intervalo', type=float, default=2.0,
+                            help="Segundos de espera cuando la cola está vacía (default: 2)")
+        parser.add_argument('--una-vez', action='store_true',
+                            help="Procesa lo pendiente y termina")
+
+    def handle(self, *args, **options):
+        procesos = max(1, options['procesos'])
+        total = 0
+
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso) as pool:
+            while True:
+                close_old_connections()
+                ids = reclamar_pendientes(lote=procesos)
+
+                if ids:
+                    # Los hijos no deben heredar la conexión abierta del maestro
+                    connections.close_all()
+                    for reporte_id, estado in zip(ids, pool.map(_procesar, ids)):
+                        icono = "📄" if estado == 'listo' else "❌"
+                        self.stdout.write(f"{icono} Reporte #{reporte_id}: {estado}")
+                    total += len(ids)
+                    continue
+
+                if options['una_vez']:
+                    break
+                time.sleep(options['intervalo'])
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Cola vacía. Total procesados: {total}"))
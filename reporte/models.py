@@ -20,6 +20,13 @@ class Reporte(models.Model):
         ('json', 'JSON'),
     ]
 
+    ESTADO_CHOICES = [
+        ('en_cola', 'En cola'),
+        ('procesando', 'Procesando'),
+        ('listo', 'Listo'),
+        ('fallido', 'Fallido'),
+    ]
+
     tipo = models.CharField(
         max_length=20,
         choices=TIPO_CHOICES,
@@ -64,6 +71,39 @@ class Reporte(models.Model):
         blank=True,
         help_text="Fecha de fin del período del reporte"
     )
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default='listo',
+        db_index=True,
+        help_text="Estado del trabajo de generación (ver comando procesar_reportes)"
+    )
+    error = models.TextField(
+        null=True,
+        blank=True,
+        help_text="Error de la última generación fallida"
+    )
+    fecha_finalizacion = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Fecha y hora en que terminó la generación"
+    )
+    fecha_reclamo = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Fecha y hora en que un worker tomó el reporte por última vez"
+    )
+    intentos = models.PositiveIntegerField(
+        default=0,
+        help_text="Veces que un worker tomó el reporte"
+    )
+    huella = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        db_index=True,
+        help_text="Hash de parámetros normalizados + marca de agua de datos (caché de archivos)"
+    )
 
     class Meta:
         ordering = ['-fecha_generacion']
@@ -6,7 +6,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.utils import timezone
 
 from reporte.models import Reporte
@@ -15,6 +15,7 @@ from reporte.utils import (
     generar_reporte_ventas_pdf,
     generar_reporte_ventas_excel,
     generar_datos_reporte_ventas,
+    serializar_json,
     generar_reporte_productos_pdf,
     generar_reporte_clientes_pdf,
     generar_reporte_inventario_pdf,
@@ -302,7 +303,9 @@ def generar_reporte_dinamico(request):
         # ✅ JSON (universal)
         elif formato == "json":
             print("🧩 [DEBUG] Generando archivo JSON... - reporte_dinamico_views.py:304")
-            archivo_buffer = json.dumps(datos_reporte, indent=2, ensure_ascii=False).encode("utf-8")
+            archivo_buffer = json.dumps(
+                datos_reporte, indent=2, ensure_ascii=False, default=serializar_json
+            ).encode("utf-8")
             nombre_archivo = f"reporte_{tipo}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.json"
             content_type = "application/json"
 
@@ -352,7 +355,7 @@ def generar_reporte_dinamico(request):
         if isinstance(archivo_buffer, bytes):
             content = ContentFile(archivo_buffer)
         else:
-            content = ContentFile(archivo_buffer.read())
+            content = File(archivo_buffer)
         reporte.archivo.save(nombre_archivo, content, save=True)
         print("💾 [DEBUG] Archivo guardado en el modelo Reporte. - reporte_dinamico_views.py:357")
 
@@ -36,9 +36,15 @@ class ReporteSerializer(serializers.ModelSerializer):
             'archivo_url',
             'parametros',
             'fecha_inicio',
-            'fecha_fin'
+            'fecha_fin',
+            'estado',
+            'error',
+            'fecha_finalizacion'
+        ]
+        read_only_fields = [
+            'fecha_generacion', 'generado_por', 'archivo',
+            'estado', 'error', 'fecha_finalizacion'
         ]
-        read_only_fields = ['fecha_generacion', 'generado_por', 'archivo']
 
     def get_archivo_url(self, obj):
         """Retorna la URL del archivo si existe."""
@@ -68,6 +74,8 @@ class ReporteCreateSerializer(serializers.Serializer):
     # Parámetros adicionales opcionales
     incluir_graficos = serializers.BooleanField(default=True)
     agrupar_por = serializers.CharField(required=False, allow_blank=True)
+    # Solo reportes de ventas: todas las ventas del período en lugar de las últimas 50
+    detalle_completo = serializers.BooleanField(default=False)
 
     def validate(self, data):
         """Validaciones personalizadas."""
@@ -3,7 +3,7 @@ Utilidades para generar reportes en diferentes formatos con opción de incluir g
 """
 
 from openpyxl.chart import BarChart, Reference, LineChart
-from venta.models import Venta  # ✅ asegúrate que el path sea correcto
+from venta.models import VentaDiaria  # ✅ asegúrate que el path sea correcto
 import tempfile
 from reportlab.pdfgen import canvas
 from io import BytesIO
@@ -25,6 +25,8 @@ from reportlab.platypus import (
 )
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 import openpyxl
+from itertools import chain, islice
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 from openpyxl.drawing.image import Image as XLImage
@@ -71,6 +73,59 @@ def generar_grafico_ventas_por_mes(datos):
     return buffer_img
 
 
+# ===========================================================
+# 🧾 TABLAS PDF POR BLOQUES
+# ===========================================================
+# Una sola Table con miles de filas hace que reportlab mida y parta la tabla
+# completa en cada página. En su lugar se generan tablas del tamaño de una
+# página (con el encabezado repetido) a partir de un iterador de filas, y se
+# crean recién cuando doc.build las necesita.
+FILAS_POR_PAGINA_PDF = 34
+
+
+def tablas_por_bloques(encabezado, filas, col_widths, estilo, filas_por_bloque=FILAS_POR_PAGINA_PDF):
+    """Genera una ``Table`` por cada ``filas_por_bloque`` filas, con ``encabezado`` repetido."""
+    filas = iter(filas)
+    while True:
+        bloque = list(islice(filas, filas_por_bloque))
+        if not bloque:
+            return
+        tabla = Table([encabezado, *bloque], colWidths=col_widths, repeatRows=1)
+        tabla.setStyle(estilo)
+        yield tabla
+
+
+class FlowablesDiferidos(list):
+    """
+    Lista de flowables que se completa a medida que ``doc.build`` la consume.
+
+    reportlab recorre la lista desde el principio (``[0]``, ``del [0]``,
+    ``insert(0, ...)``), pero ``handle_keepWithNext`` además mira por delante
+    del primero: ``len()`` y los índices siguientes hasta el primer flowable
+    sin ``keepWithNext``. Por eso se mantiene cargado todo ese tramo más el
+    elemento que lo cierra; el resto de bloques de tabla se crea justo antes
+    de maquetarse y se libera una vez dibujado.
+    """
+
+    def __init__(self, flowables):
+        super().__init__()
+        self._fuente = iter(flowables)
+
+    def _cargar(self):
+        while not super().__len__() or super().__getitem__(-1).getKeepWithNext():
+            siguiente = next(self._fuente, None)
+            if siguiente is None:
+                return
+            self.append(siguiente)
+
+    def __len__(self):
+        self._cargar()
+        return super().__len__()
+
+    def __bool__(self):
+        return len(self) > 0
+
+
 # ===========================================================
 # 🧾 GENERADOR DE PDF
 # ===========================================================
@@ -149,23 +204,21 @@ def generar_reporte_ventas_pdf(
         elements.append(Paragraph("Detalle de Ventas", styles["Heading2"]))
         elements.append(Spacer(1, 10))
 
-        ventas_data = [["ID", "Cliente", "Fecha", "Total", "Estado"]]
-        for venta in datos["ventas_detalle"]:
-            ventas_data.append(
-                [
-                    str(venta["id"]),
-                    venta["usuario"],
-                    venta["fecha"],
-                    f"${venta['total']:.2f}",
-                    venta["estado"],
-                ]
-            )
-        ventas_table = Table(
-            ventas_data,
-            colWidths=[0.7 * inch, 2 * inch, 1.5 * inch, 1.2 * inch, 1.2 * inch],
+        filas = (
+            [
+                str(venta["id"]),
+                venta["usuario"],
+                venta["fecha"],
+                f"${venta['total']:.2f}",
+                venta["estado"],
+            ]
+            for venta in datos["ventas_detalle"]
         )
-        ventas_table.setStyle(
-            TableStyle(
+        ventas_tablas = tablas_por_bloques(
+            ["ID", "Cliente", "Fecha", "Total", "Estado"],
+            filas,
+            col_widths=[0.7 * inch, 2 * inch, 1.5 * inch, 1.2 * inch, 1.2 * inch],
+            estilo=TableStyle(
                 [
                     ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#34495e")),
                     ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
@@ -178,12 +231,12 @@ def generar_reporte_ventas_pdf(
                         [colors.white, colors.lightgrey],
                     ),
                 ]
-            )
+            ),
         )
-        elements.append(ventas_table)
+    else:
+        ventas_tablas = []
 
     # === PIE ===
-    elements.append(Spacer(1, 20))
     fecha_gen = timezone.now().strftime("%d/%m/%Y %H:%M:%S")
     pie = Paragraph(
         f"<i>Reporte generado el {fecha_gen}</i>",
@@ -195,22 +248,77 @@ def generar_reporte_ventas_pdf(
             alignment=TA_RIGHT,
         ),
     )
-    elements.append(pie)
 
-    doc.build(elements)
+    # Las tablas del detalle se crean a medida que se maquetan
+    doc.build(FlowablesDiferidos(chain(elements, ventas_tablas, [Spacer(1, 20), pie])))
     buffer.seek(0)
     return buffer
 
 
+# ===========================================================
+# 🧾 EXCEL EN STREAMING (openpyxl write_only)
+# ===========================================================
+# Las filas se escriben a disco a medida que llegan, sin crear un objeto por
+# celda. Los anchos de columna deben fijarse antes de la primera fila, por eso
+# se calculan con una muestra acotada de las filas.
+MUESTRA_ANCHOS_EXCEL = 500
+ANCHO_MAXIMO_COLUMNA = 60
+EXCEL_MAX_EN_MEMORIA = 5 * 1024 * 1024
+
+
+def muestrear_anchos(filas, fijas=(), muestra=MUESTRA_ANCHOS_EXCEL):
+    """
+    Anchos de columna según las filas ``fijas`` y las primeras ``muestra``
+    filas del iterable. Devuelve ``(anchos, filas)``; el segundo valor
+    reproduce el iterable completo, incluidas las filas muestreadas.
+    """
+    filas = iter(filas)
+    primeras = list(islice(filas, muestra))
+    anchos = {}
+    for fila in chain(fijas, primeras):
+        for columna, valor in enumerate(fila, 1):
+            if valor not in (None, ""):
+                anchos[columna] = max(anchos.get(columna, 0), len(str(valor)))
+    return anchos, chain(primeras, filas)
+
+
+def aplicar_anchos(ws, anchos, minimo=0):
+    for columna, ancho in anchos.items():
+        ws.column_dimensions[get_column_letter(columna)].width = min(
+            max(ancho + 2, minimo), ANCHO_MAXIMO_COLUMNA
+        )
+
+
+def celda(ws, valor, font=None, fill=None, alignment=None, number_format=None):
+    """Celda con estilo para hojas write_only."""
+    c = WriteOnlyCell(ws, value=valor)
+    if font:
+        c.font = font
+    if fill:
+        c.fill = fill
+    if alignment:
+        c.alignment = alignment
+    if number_format:
+        c.number_format = number_format
+    return c
+
+
+def guardar_libro(wb):
+    """Guarda el libro en un archivo temporal (en memoria hasta 5 MB, luego en disco)."""
+    archivo = tempfile.SpooledTemporaryFile(max_size=EXCEL_MAX_EN_MEMORIA)
+    wb.save(archivo)
+    archivo.seek(0)
+    return archivo
+
+
 # ===========================================================
 # 🧾 GENERADOR DE EXCEL
 # ===========================================================
 def generar_reporte_ventas_excel(
     datos, fecha_inicio=None, fecha_fin=None, incluir_graficos=True
 ):
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Reporte de Ventas"
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Reporte de Ventas")
 
     header_fill = PatternFill(
         start_color="3498db", end_color="3498db", fill_type="solid"
@@ -218,69 +326,56 @@ def generar_reporte_ventas_excel(
     header_font = Font(bold=True, color="FFFFFF", size=12)
     title_font = Font(bold=True, size=16, color="2c3e50")
 
-    ws["A1"] = "SmartSales365 - Reporte de Ventas"
-    ws["A1"].font = title_font
-    ws.merge_cells("A1:E1")
-    ws["A1"].alignment = Alignment(horizontal="center")
-
-    if fecha_inicio and fecha_fin:
-        ws["A2"] = (
-            f"Período: {fecha_inicio.strftime('%d/%m/%Y')} - {fecha_fin.strftime('%d/%m/%Y')}"
-        )
-        ws.merge_cells("A2:E2")
-        ws["A2"].alignment = Alignment(horizontal="center")
-
-    row = 4
-    ws[f"A{row}"] = "RESUMEN GENERAL"
-    ws[f"A{row}"].font = Font(bold=True, size=12)
-    ws.merge_cells(f"A{row}:B{row}")
-
-    row += 1
     resumen_items = [
         ("Total de Ventas", datos["total_ventas"]),
         ("Cantidad de Ventas", datos["cantidad_ventas"]),
         ("Ticket Promedio", datos["ticket_promedio"]),
         ("Productos Vendidos", datos["productos_vendidos"]),
     ]
-    for label, valor in resumen_items:
-        ws[f"A{row}"] = label
-        ws[f"B{row}"] = valor
-        ws[f"B{row}"].number_format = "#,##0.00"
-        ws[f"A{row}"].font = Font(bold=True)
-        row += 1
+    headers = ["ID", "Cliente", "Fecha", "Total", "Estado"]
+    detalle = datos.get("ventas_detalle")
+    filas = (
+        [venta["id"], venta["usuario"], venta["fecha"], venta["total"], venta["estado"]]
+        for venta in (detalle or [])
+    )
+    anchos, filas = muestrear_anchos(filas, fijas=[headers, *resumen_items])
+    aplicar_anchos(ws, anchos)
 
-    if datos.get("ventas_detalle"):
-        row += 2
-        ws[f"A{row}"] = "DETALLE DE VENTAS"
-        ws[f"A{row}"].font = Font(bold=True, size=12)
-        ws.merge_cells(f"A{row}:E{row}")
-        row += 1
-
-        headers = ["ID", "Cliente", "Fecha", "Total", "Estado"]
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col_num)
-            cell.value = header
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
+    ws.append([celda(ws, "SmartSales365 - Reporte de Ventas", font=title_font,
+                     alignment=Alignment(horizontal="center"))])
+    ws.merged_cells.add("A1:E1")
 
-        row += 1
-        for venta in datos["ventas_detalle"]:
-            ws.cell(row=row, column=1, value=venta["id"])
-            ws.cell(row=row, column=2, value=venta["usuario"])
-            ws.cell(row=row, column=3, value=venta["fecha"])
-            ws.cell(row=row, column=4, value=venta["total"])
-            ws.cell(row=row, column=5, value=venta["estado"])
-            row += 1
-
-    # Ajuste de columnas
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
-            if cell.value:
-                max_length = max(max_length, len(str(cell.value)))
-        ws.column_dimensions[column_letter].width = max_length + 2
+    if fecha_inicio and fecha_fin:
+        ws.append([celda(
+            ws,
+            f"Período: {fecha_inicio.strftime('%d/%m/%Y')} - {fecha_fin.strftime('%d/%m/%Y')}",
+            alignment=Alignment(horizontal="center"),
+        )])
+        ws.merged_cells.add("A2:E2")
+    else:
+        ws.append([])
+    ws.append([])
+
+    ws.append([celda(ws, "RESUMEN GENERAL", font=Font(bold=True, size=12))])
+    ws.merged_cells.add("A4:B4")
+    for label, valor in resumen_items:
+        ws.append([
+            celda(ws, label, font=Font(bold=True)),
+            celda(ws, valor, number_format="#,##0.00"),
+        ])
+
+    if detalle:
+        ws.append([])
+        ws.append([])
+        ws.append([celda(ws, "DETALLE DE VENTAS", font=Font(bold=True, size=12))])
+        ws.merged_cells.add("A11:E11")
+        ws.append([
+            celda(ws, header, font=header_font, fill=header_fill,
+                  alignment=Alignment(horizontal="center"))
+            for header in headers
+        ])
+        for fila in filas:
+            ws.append(fila)
 
     # === Insertar gráfico (opcional) ===
     if incluir_graficos:
@@ -290,21 +385,67 @@ def generar_reporte_ventas_excel(
             img.anchor = f"G5"
             ws.add_image(img)
 
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    return buffer
+    return guardar_libro(wb)
 
 
 # ===========================================================
 # 📈 OBTENCIÓN DE DATOS
 # ===========================================================
-def generar_datos_reporte_ventas(fecha_inicio=None, fecha_fin=None):
+LIMITE_DETALLE_VENTAS = 50
+TAMANO_BLOQUE_FILAS = 2000
+
+
+def _fila_detalle_venta(venta):
+    return {
+        "id": venta.id,
+        "usuario": venta.usuario.username if venta.usuario else "N/A",
+        "fecha": venta.fecha.strftime("%d/%m/%Y %H:%M"),
+        "total": float(venta.total),
+        "estado": venta.get_estado_display(),
+    }
+
+
+class FilasDiferidas:
+    """
+    Filas de un reporte leídas de la base por bloques cada vez que se recorren
+    (``consulta.iterator()`` + ``convertir`` por fila). Se pueden iterar varias
+    veces (gráfico + tabla) sin cargar todas las filas en memoria; ``cantidad``
+    viene de un conteo ya hecho y evita recorrerlas para ``len()``.
+    """
+
+    def __init__(self, consulta, convertir, cantidad):
+        self.consulta = consulta
+        self.convertir = convertir
+        self.cantidad = cantidad
+
+    def __iter__(self):
+        for fila in self.consulta.iterator(chunk_size=TAMANO_BLOQUE_FILAS):
+            yield self.convertir(fila)
+
+    def __len__(self):
+        return self.cantidad
+
+    def __bool__(self):
+        return self.cantidad > 0
+
+
+def serializar_json(valor):
+    """``default`` de ``json.dumps`` para los datos de reportes con ``FilasDiferidas``."""
+    if isinstance(valor, FilasDiferidas):
+        return list(valor)
+    raise TypeError(f"{type(valor).__name__} no es serializable a JSON")
+
+
+def generar_datos_reporte_ventas(fecha_inicio=None, fecha_fin=None, detalle_completo=False):
     """
     Obtiene datos agregados de ventas, filtrados por fecha.
+
+    Por defecto el detalle se limita a las últimas 50 ventas. Con
+    ``detalle_completo=True`` incluye todas las ventas del período como
+    ``FilasDiferidas``, que se leen por bloques al renderizar.
     """
     from venta.models import Venta, DetalleVenta
-    from django.db.models import Q
+    from django.db.models import OuterRef, Subquery
 
     ventas_query = Venta.objects.filter(estado="pagado")
     if fecha_inicio:
@@ -312,34 +453,37 @@ def generar_datos_reporte_ventas(fecha_inicio=None, fecha_fin=None):
     if fecha_fin:
         ventas_query = ventas_query.filter(fecha__lte=fecha_fin)
 
-    total_ventas = ventas_query.aggregate(total=Sum("total"))["total"] or 0
-    cantidad_ventas = ventas_query.count()
+    # Total, cantidad y unidades vendidas en una sola consulta
+    unidades = (
+        DetalleVenta.objects.filter(venta=OuterRef("pk"))
+        .values("venta")
+        .annotate(total=Sum("cantidad"))
+        .values("total")
+    )
+    totales = ventas_query.annotate(unidades=Subquery(unidades)).aggregate(
+        total=Sum("total"), cantidad=Count("id"), productos=Sum("unidades")
+    )
+    total_ventas = totales["total"] or 0
+    cantidad_ventas = totales["cantidad"]
     ticket_promedio = total_ventas / cantidad_ventas if cantidad_ventas > 0 else 0
 
-    productos_vendidos = (
-        DetalleVenta.objects.filter(venta__in=ventas_query).aggregate(
-            total=Sum("cantidad")
-        )["total"]
-        or 0
+    detalle_query = (
+        ventas_query.select_related("usuario")
+        .only("id", "fecha", "total", "estado", "usuario__username")
+        .order_by("-fecha", "-id")
     )
-
-    ventas_detalle = []
-    for venta in ventas_query.order_by("-fecha")[:50]:
-        ventas_detalle.append(
-            {
-                "id": venta.id,
-                "usuario": venta.usuario.username if venta.usuario else "N/A",
-                "fecha": venta.fecha.strftime("%d/%m/%Y %H:%M"),
-                "total": float(venta.total),
-                "estado": venta.get_estado_display(),
-            }
-        )
+    if detalle_completo:
+        ventas_detalle = FilasDiferidas(detalle_query, _fila_detalle_venta, cantidad_ventas)
+    else:
+        ventas_detalle = [
+            _fila_detalle_venta(venta) for venta in detalle_query[:LIMITE_DETALLE_VENTAS]
+        ]
 
     return {
         "total_ventas": float(total_ventas),
         "cantidad_ventas": cantidad_ventas,
         "ticket_promedio": float(ticket_promedio),
-        "productos_vendidos": productos_vendidos,
+        "productos_vendidos": totales["productos"] or 0,
         "ventas_detalle": ventas_detalle,
     }
 
@@ -379,34 +523,33 @@ def generar_reporte_productos_pdf(datos):
     elements.append(resumen_table)
     elements.append(Spacer(1, 20))
 
-    # Detalle de productos
-    products_data = [["ID", "Nombre", "Marca", "Categoría", "Precio", "Stock"]]
-    for p in datos["productos"]:
-        products_data.append(
-            [
-                p["id"],
-                p["nombre"],
-                p["marca"],
-                p["categoria"],
-                f"${p['precio']:.2f}",
-                p["stock"],
-            ]
-        )
-
-    table = Table(products_data, colWidths=[40, 120, 80, 80, 80, 60])
-    table.setStyle(
-        TableStyle(
+    # Detalle de productos, en tablas de una página
+    filas = (
+        [
+            p["id"],
+            p["nombre"],
+            p["marca"],
+            p["categoria"],
+            f"${p['precio']:.2f}",
+            p["stock"],
+        ]
+        for p in datos["productos"]
+    )
+    tablas = tablas_por_bloques(
+        ["ID", "Nombre", "Marca", "Categoría", "Precio", "Stock"],
+        filas,
+        col_widths=[40, 120, 80, 80, 80, 60],
+        estilo=TableStyle(
             [
                 ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#34495e")),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "CENTER"),
                 ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
             ]
-        )
+        ),
     )
-    elements.append(table)
 
-    doc.build(elements)
+    doc.build(FlowablesDiferidos(chain(elements, tablas)))
     buffer.seek(0)
     return buffer
 
@@ -417,13 +560,15 @@ def generar_reporte_productos_pdf(datos):
 ############################################################
 
 def generar_reporte_productos_excel(datos_reporte):
-    buffer = BytesIO()
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Productos"
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Productos")
 
-    # Encabezado
+    # Ancho fijo de columnas (antes de escribir filas en modo write_only)
     headers = ["ID", "Nombre", "Marca", "Categoría", "Precio", "Stock", "Estado"]
+    for i, col in enumerate(headers, 1):
+        ws.column_dimensions[get_column_letter(i)].width = 15
+
+    # Encabezado
     ws.append(headers)
 
     # Filas de datos
@@ -438,13 +583,7 @@ def generar_reporte_productos_excel(datos_reporte):
             p["estado"],
         ])
 
-    # Ajustar ancho de columnas
-    for i, col in enumerate(headers, 1):
-        ws.column_dimensions[get_column_letter(i)].width = 15
-
-    wb.save(buffer)
-    buffer.seek(0)
-    return buffer
+    return guardar_libro(wb)
 
 
 
@@ -503,13 +642,11 @@ def generar_reporte_clientes_excel(datos_reporte, incluir_graficos=True):
     Genera un archivo Excel con los datos de clientes.
     Si incluir_graficos=True, añade un gráfico de barras de total de compras.
     """
-    buffer = BytesIO()
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Clientes"
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Clientes")
 
     # ==============================
-    # ENCABEZADOS
+    # AJUSTAR ANCHO DE COLUMNAS
     # ==============================
     headers = [
         "ID",
@@ -519,19 +656,23 @@ def generar_reporte_clientes_excel(datos_reporte, incluir_graficos=True):
         "Total Compras (Bs.)",
         "Fecha Registro",
     ]
-    ws.append(headers)
+    for i, col in enumerate(headers, 1):
+        ws.column_dimensions[get_column_letter(i)].width = 22
 
+    # ==============================
+    # ENCABEZADOS
+    # ==============================
     header_font = Font(bold=True)
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num)
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center")
+    ws.append([
+        celda(ws, header, font=header_font, alignment=Alignment(horizontal="center"))
+        for header in headers
+    ])
 
     # ==============================
     # FILAS DE DATOS
     # ==============================
-    clientes = datos_reporte.get("clientes", [])
-    for c in clientes:
+    cantidad = 0
+    for c in datos_reporte.get("clientes", []):
         ws.append([
             c["id"],
             c["username"],
@@ -540,35 +681,30 @@ def generar_reporte_clientes_excel(datos_reporte, incluir_graficos=True):
             c["total_compras"],
             c["fecha_registro"],
         ])
-
-    # ==============================
-    # AJUSTAR ANCHO DE COLUMNAS
-    # ==============================
-    for i, col in enumerate(headers, 1):
-        ws.column_dimensions[get_column_letter(i)].width = 22
+        cantidad += 1
 
     # ==============================
     # RESUMEN
     # ==============================
     total_clientes = datos_reporte.get("total_clientes", 0)
     ws.append([])
-    ws.append(["", "", "", "TOTAL CLIENTES:", total_clientes])
-    last_row = ws.max_row
-    ws.cell(row=last_row, column=4).font = Font(bold=True)
-    ws.cell(row=last_row, column=5).font = Font(bold=True)
+    ws.append([
+        "", "", "",
+        celda(ws, "TOTAL CLIENTES:", font=Font(bold=True)),
+        celda(ws, total_clientes, font=Font(bold=True)),
+    ])
 
     # ==============================
     # GRÁFICO DE BARRAS (opcional)
     # ==============================
-    if incluir_graficos and clientes:
+    if incluir_graficos and cantidad:
         chart = BarChart()
         chart.title = "Total de compras por cliente"
         chart.x_axis.title = "Clientes"
         chart.y_axis.title = "Monto total (Bs.)"
 
         # Determinar rango de datos
-        start_row = 2
-        end_row = 1 + len(clientes)
+        end_row = 1 + cantidad
         data = Reference(ws, min_col=5, min_row=1, max_row=end_row)  # Total Compras
         cats = Reference(ws, min_col=2, min_row=2, max_row=end_row)  # Username
 
@@ -582,10 +718,7 @@ def generar_reporte_clientes_excel(datos_reporte, incluir_graficos=True):
         # Ubicar el gráfico a partir de la columna H (8)
         ws.add_chart(chart, f"H4")
 
-    # Guardar en buffer
-    wb.save(buffer)
-    buffer.seek(0)
-    return buffer
+    return guardar_libro(wb)
 
 
 #############################################################################################
@@ -628,6 +761,33 @@ def generar_reporte_inventario_pdf(datos_reporte):
         p.drawString(60, y, f"- {pbs['nombre']} | Stock: {pbs['stock']} | Precio: Bs. {pbs['precio']:.2f}")
         y -= 15
 
+    # Proyección de agotamiento según velocidad de venta
+    proyecciones = datos_reporte.get("proyeccion_agotamiento_detalle", [])
+    if proyecciones:
+        y -= 25
+        if y < 100:
+            p.showPage()
+            y = height - 100
+        p.setFont("Helvetica-Bold", 12)
+        p.drawString(
+            50, y,
+            f"Se agotan en {datos_reporte.get('dias_riesgo_agotamiento', 14)} días o menos: "
+            f"{datos_reporte.get('productos_riesgo_agotamiento', 0)}"
+        )
+        y -= 20
+        p.setFont("Helvetica", 10)
+        for pa in proyecciones:
+            if y < 80:
+                p.showPage()
+                p.setFont("Helvetica", 10)
+                y = height - 100
+            p.drawString(
+                60, y,
+                f"- {pa['nombre']} | Stock: {pa['stock']} | {pa['velocidad_diaria']:.2f} u/día | "
+                f"Agota: {pa['fecha_agotamiento']} ({pa['dias_hasta_agotamiento']:.0f} días)"
+            )
+            y -= 15
+
     p.showPage()
     p.save()
 
@@ -645,22 +805,21 @@ def generar_reporte_inventario_excel(datos_reporte, incluir_graficos=True):
     Genera un archivo Excel para el reporte de inventario.
     Si incluir_graficos=True, añade un gráfico de barras de productos con bajo stock.
     """
-    buffer = BytesIO()
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Inventario"
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Inventario")
+
+    for i in range(1, 3):
+        ws.column_dimensions[get_column_letter(i)].width = 30
 
     # ===========================
     # ENCABEZADOS
     # ===========================
     headers = ["Nombre", "Stock", "Precio (Bs.)"]
-    ws.append(headers)
     header_font = Font(bold=True)
-
-    for i, h in enumerate(headers, 1):
-        c = ws.cell(row=1, column=i)
-        c.font = header_font
-        c.alignment = Alignment(horizontal="center")
+    ws.append([
+        celda(ws, h, font=header_font, alignment=Alignment(horizontal="center"))
+        for h in headers
+    ])
 
     # ===========================
     # FILAS DE PRODUCTOS BAJO STOCK
@@ -674,7 +833,6 @@ def generar_reporte_inventario_excel(datos_reporte, incluir_graficos=True):
     # ===========================
     ws.append([])
     ws.append(["", ""])
-    resumen_start = ws.max_row + 1
 
     resumen_data = [
         ["Total productos", datos_reporte.get("total_productos", 0)],
@@ -686,9 +844,6 @@ def generar_reporte_inventario_excel(datos_reporte, incluir_graficos=True):
     for row in resumen_data:
         ws.append(row)
 
-    for i in range(1, 3):
-        ws.column_dimensions[get_column_letter(i)].width = 30
-
     # ===========================
     # GRÁFICO DE STOCK (opcional)
     # ===========================
@@ -711,9 +866,23 @@ def generar_reporte_inventario_excel(datos_reporte, incluir_graficos=True):
         # Colocar el gráfico más abajo del resumen
         ws.add_chart(chart, f"E4")
 
-    wb.save(buffer)
-    buffer.seek(0)
-    return buffer
+    # ===========================
+    # PROYECCIÓN DE AGOTAMIENTO
+    # ===========================
+    proyecciones = datos_reporte.get("proyeccion_agotamiento_detalle", [])
+    if proyecciones:
+        ws_agotamiento = wb.create_sheet("Agotamiento")
+        headers = ["Nombre", "Stock", "Unidades/día", "Días hasta agotar", "Fecha estimada"]
+        for i in range(1, len(headers) + 1):
+            ws_agotamiento.column_dimensions[get_column_letter(i)].width = 22
+        ws_agotamiento.append([celda(ws_agotamiento, h, font=header_font) for h in headers])
+        for pa in proyecciones:
+            ws_agotamiento.append([
+                pa["nombre"], pa["stock"], pa["velocidad_diaria"],
+                pa["dias_hasta_agotamiento"], pa["fecha_agotamiento"],
+            ])
+
+    return guardar_libro(wb)
 
 
 
@@ -855,9 +1024,9 @@ def generar_reporte_financiero_excel(datos_reporte, incluir_graficos=True):
     ws2["A1"].font = ws2["B1"].font = Font(bold=True)
     ws2["A1"].alignment = ws2["B1"].alignment = Alignment(horizontal="center")
 
-    # Consultar datos mensuales
+    # Consultar datos mensuales desde el resumen diario
     ventas_mensuales = (
-        Venta.objects.filter(estado="pagado")
+        VentaDiaria.objects.filter(estado="pagado")
         .values_list("fecha__year", "fecha__month")
         .annotate(total_mes=Sum("total"))
         .order_by("fecha__year", "fecha__month")
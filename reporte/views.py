@@ -3,30 +3,16 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.http import FileResponse, HttpResponse
+from django.urls import reverse
 from django.utils import timezone
-from django.core.files.base import ContentFile
 from bitacora.models import Bitacora
 from users.views import get_client_ip
+from .generacion import huella_reporte, reporte_en_cache
+from .utils import FilasDiferidas
 from .models import Reporte
 from .serializers import ReporteSerializer, ReporteCreateSerializer
 
 
-from .utils import (
-	generar_reporte_ventas_pdf,
-	generar_reporte_ventas_excel,
-	generar_datos_reporte_ventas,
-	generar_reporte_productos_pdf,
-	generar_reporte_productos_excel,
-	generar_reporte_clientes_pdf,
-	generar_reporte_clientes_excel,
-	generar_reporte_inventario_pdf,
-	generar_reporte_inventario_excel,
-	generar_reporte_financiero_pdf,
-	generar_reporte_financiero_excel,
-)
-import json
-
-
 class ReporteViewSet(viewsets.ModelViewSet):
 	queryset = Reporte.objects.all()
 	serializer_class = ReporteSerializer
@@ -37,9 +23,13 @@ class ReporteViewSet(viewsets.ModelViewSet):
 			return Reporte.objects.all()
 		return Reporte.objects.filter(generado_por=self.request.user)
 
-	# 👇👇 Mueve aquí el método generar (dentro de la clase, con indentación)
 	@action(detail=False, methods=["post"], url_path="generar")
 	def generar(self, request):
+		"""
+		Encola la generación de un reporte y responde 202 con el id del trabajo.
+		El comando procesar_reportes genera el archivo; el progreso se consulta en
+		GET /api/reportes/{id}/estado/ y el archivo en /api/reportes/{id}/descargar/.
+		"""
 		print("🟢 [INICIO] Llamada a /api/reportes/generar/ - views.py:43")
 
 		serializer = ReporteCreateSerializer(data=request.data)
@@ -58,182 +48,45 @@ class ReporteViewSet(viewsets.ModelViewSet):
 
 		print(f"🧾 Tipo: {tipo} | Formato: {formato} - views.py:59")
 		print(f"🗓️ Periodo: {fecha_inicio} → {fecha_fin} - views.py:60")
-		print(f"📝 Descripción: {descripcion} - views.py:61")
-
-		try:
-			print("⚙️ Generando datos del reporte... - views.py:64")
-
-			if tipo == "ventas":
-				datos_reporte = generar_datos_reporte_ventas(fecha_inicio, fecha_fin)
-			elif tipo == "productos":
-				datos_reporte = self._generar_datos_productos()
-			elif tipo == "clientes":
-				datos_reporte = self._generar_datos_clientes()
-			elif tipo == "inventario":
-				datos_reporte = self._generar_datos_inventario()
-			elif tipo == "financiero":
-				datos_reporte = self._generar_datos_financiero(fecha_inicio, fecha_fin)
-			else:
-				print("🚫 Tipo de reporte no soportado: - views.py:77", tipo)
-				return Response(
-					{"error": "Tipo de reporte no soportado"},
-					status=status.HTTP_400_BAD_REQUEST,
-				)
-
-			print(
-				f"✅ Datos del reporte generados correctamente. Claves: {list(datos_reporte.keys())}"
-			)
 
-			print(f"🧩 Generando archivo en formato {formato.upper()}... - views.py:87")
-
-			archivo_buffer = None
-			nombre_archivo = None
-			content_type = None
-
-			if formato == "pdf":
-				if tipo == "ventas":
-					archivo_buffer = generar_reporte_ventas_pdf(
-						datos_reporte, fecha_inicio, fecha_fin
-					)
-					nombre_archivo = (
-						f'reporte_ventas_{timezone.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-					)
-					content_type = "application/pdf"
-
-				elif tipo == "productos":
-					archivo_buffer = generar_reporte_productos_pdf(datos_reporte)
-					nombre_archivo = f'reporte_productos_{timezone.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-					content_type = "application/pdf"
-
-				elif tipo == "clientes":  # ✅ nuevo bloque
-					archivo_buffer = generar_reporte_clientes_pdf(datos_reporte)
-					nombre_archivo = f'reporte_clientes_{timezone.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-					content_type = "application/pdf"
-
-				elif tipo == "inventario":
-					archivo_buffer = generar_reporte_inventario_pdf(datos_reporte)
-					nombre_archivo = f'reporte_inventario_{timezone.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-					content_type = "application/pdf"
-
-				elif tipo == "financiero":  # ✅ nuevo bloque
-					archivo_buffer = generar_reporte_financiero_pdf(
-						datos_reporte,
-						incluir_graficos=data.get("incluir_graficos", True),
-					)
-					nombre_archivo = f'reporte_financiero_{timezone.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-					content_type = "application/pdf"
-
-			elif formato == "excel":
-				if tipo == "ventas":
-					archivo_buffer = generar_reporte_ventas_excel(
-						datos_reporte, fecha_inicio, fecha_fin
-					)
-					nombre_archivo = f'reporte_ventas_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-					content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-
-				elif tipo == "productos":  # ✅ nuevo bloque
-					archivo_buffer = generar_reporte_productos_excel(datos_reporte)
-					nombre_archivo = f'reporte_productos_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-					content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-
-				elif tipo == "clientes":  # ✅ con gráficos opcionales
-					archivo_buffer = generar_reporte_clientes_excel(
-						datos_reporte,
-						incluir_graficos=data.get("incluir_graficos", True),
-					)
-					nombre_archivo = f'reporte_clientes_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-					content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-
-				elif tipo == "inventario":  # ✅ nuevo bloque
-					archivo_buffer = generar_reporte_inventario_excel(
-						datos_reporte,
-						incluir_graficos=data.get("incluir_graficos", True),
-					)
-					nombre_archivo = f'reporte_inventario_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-					content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-				elif tipo == "financiero":  # ✅ nuevo bloque
-					archivo_buffer = generar_reporte_financiero_excel(
-						datos_reporte,
-						incluir_graficos=data.get("incluir_graficos", True),
-					)
-					nombre_archivo = f'reporte_financiero_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-					content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-
-			elif formato == "json":
-				archivo_buffer = json.dumps(
-					datos_reporte, indent=2, ensure_ascii=False
-				).encode("utf-8")
-				nombre_archivo = (
-					f'reporte_{tipo}_{timezone.now().strftime("%Y%m%d_%H%M%S")}.json'
-				)
-				content_type = "application/json"
-
-			else:
-				print("🚫 Formato no soportado: - views.py:172", formato)
-				return Response(
-					{"error": "Formato no soportado"},
-					status=status.HTTP_400_BAD_REQUEST,
-				)
-
-			if not archivo_buffer:
-				print(
-					"❌ ERROR: No se generó el archivo correctamente (archivo_buffer vacío)."
-				)
-				return Response(
-					{
-						"error": "No se pudo generar el archivo para el tipo y formato seleccionados."
-					},
-					status=status.HTTP_400_BAD_REQUEST,
-				)
-
-			print("✅ Archivo generado correctamente: - views.py:189", nombre_archivo)
-
-			print(
-				"💾 Guardando registro del reporte en la base de datos..."
-			)
-
-			reporte = Reporte.objects.create(
-				tipo=tipo,
-				descripcion=descripcion,
-				generado_por=request.user,
-				formato=formato,
-				parametros={
-					"fecha_inicio": str(fecha_inicio) if fecha_inicio else None,
-					"fecha_fin": str(fecha_fin) if fecha_fin else None,
-					"incluir_graficos": data.get("incluir_graficos", True),
-					"agrupar_por": data.get("agrupar_por", ""),
-				},
-				fecha_inicio=fecha_inicio,
-				fecha_fin=fecha_fin,
-			)
-
-			print(f"🆔 Reporte creado con ID: {reporte.id} - views.py:210")
-
-			print("📂 Guardando archivo en MEDIA_ROOT... - views.py:212")
-
-			if isinstance(archivo_buffer, bytes):
-				content = ContentFile(archivo_buffer)
-			else:
-				content = ContentFile(archivo_buffer.read())
-
-			reporte.archivo.save(nombre_archivo, content, save=True)
-			print(f"📁 Archivo guardado en: {reporte.archivo.path} - views.py:220")
-
-			print("🪶 Registrando acción en bitácora... - views.py:222")
-
-			Bitacora.objects.create(
-				usuario=request.user,
-				accion=f"Generó reporte de {tipo} en formato {formato}",
-				ip=get_client_ip(request),
-				estado=True,
-			)
+		huella = huella_reporte(
+			tipo, formato, fecha_inicio, fecha_fin,
+			data.get("incluir_graficos", True), data.get("agrupar_por", ""),
+			data.get("detalle_completo", False),
+		)
+		existente = reporte_en_cache(huella)
+
+		reporte = Reporte.objects.create(
+			tipo=tipo,
+			descripcion=descripcion,
+			generado_por=request.user,
+			formato=formato,
+			parametros={
+				"fecha_inicio": str(fecha_inicio) if fecha_inicio else None,
+				"fecha_fin": str(fecha_fin) if fecha_fin else None,
+				"incluir_graficos": data.get("incluir_graficos", True),
+				"agrupar_por": data.get("agrupar_por", ""),
+				"detalle_completo": data.get("detalle_completo", False),
+			},
+			fecha_inicio=fecha_inicio,
+			fecha_fin=fecha_fin,
+			estado="listo" if existente else "en_cola",
+			huella=huella,
+			archivo=existente.archivo.name if existente else None,
+			fecha_finalizacion=timezone.now() if existente else None,
+		)
+		print(f"🆔 Reporte #{reporte.id} {'reutiliza #%s' % existente.id if existente else 'en cola'} - views.py:76")
 
-			print("✅ Bitácora registrada correctamente. - views.py:231")
-			response_serializer = ReporteSerializer(
-				reporte, context={"request": request}
-			)
-			print("🎉 Reporte generado con éxito. - views.py:235")
+		Bitacora.objects.create(
+			usuario=request.user,
+			accion=f"Generó reporte de {tipo} en formato {formato}",
+			ip=get_client_ip(request),
+			estado=True,
+		)
 
+		response_serializer = ReporteSerializer(reporte, context={"request": request})
+		if existente:
+			# Mismos parámetros y mismos datos: se reutiliza el archivo ya generado
 			return Response(
 				{
 					"mensaje": "Reporte generado exitosamente",
@@ -242,15 +95,35 @@ class ReporteViewSet(viewsets.ModelViewSet):
 				status=status.HTTP_201_CREATED,
 			)
 
-		except Exception as e:
-			print("💥 ERROR FATAL al generar el reporte: - views.py:246")
-			import traceback
+		return Response(
+			{
+				"mensaje": "Reporte en cola de generación",
+				"reporte": response_serializer.data,
+				"estado_url": request.build_absolute_uri(
+					reverse("reporte-estado", args=[reporte.id])
+				),
+			},
+			status=status.HTTP_202_ACCEPTED,
+		)
 
-			traceback.print_exc()
-			return Response(
-				{"error": f"Error al generar reporte: {str(e)}"},
-				status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-			)
+	@action(detail=True, methods=["get"], url_path="estado")
+	def estado(self, request, pk=None):
+		"""
+		Estado del trabajo de generación de un reporte.
+
+		GET /api/reportes/{id}/estado/
+		"""
+		reporte = self.get_object()
+		serializer = self.get_serializer(reporte)
+		return Response(
+			{
+				"id": reporte.id,
+				"estado": reporte.estado,
+				"error": reporte.error,
+				"archivo_url": serializer.data["archivo_url"],
+			},
+			status=status.HTTP_200_OK,
+		)
 
 	@action(detail=True, methods=["get"], url_path="descargar")
 	def descargar(self, request, pk=None):
@@ -264,6 +137,12 @@ class ReporteViewSet(viewsets.ModelViewSet):
 		reporte = self.get_object()
 		print(f"🔍 Reporte encontrado: {reporte.id}  {reporte.descripcion} - views.py:265")
 
+		if reporte.estado in ("en_cola", "procesando"):
+			return Response(
+				{"error": "El reporte todavía se está generando", "estado": reporte.estado},
+				status=status.HTTP_409_CONFLICT,
+			)
+
 		if not reporte.archivo:
 			print("⚠️ El reporte no tiene archivo asociado. - views.py:268")
 			return Response(
@@ -343,112 +222,154 @@ class ReporteViewSet(viewsets.ModelViewSet):
 			estado=True,
 		)
 
-		# Eliminar el archivo físico si existe
-		if instance.archivo:
-			instance.archivo.delete()
+		# Eliminar el archivo físico si ningún otro reporte lo comparte
+		if instance.archivo and not Reporte.objects.filter(
+			archivo=instance.archivo.name
+		).exclude(id=instance.id).exists():
+			instance.archivo.delete(save=False)
 
 		instance.delete()
 
 	# Métodos auxiliares para generar datos de otros tipos de reportes
 
+	def _totales_inventario(self, productos):
+		"""Conteos y valorización del inventario en una sola consulta agregada."""
+		from django.db.models import Count, DecimalField, F, Q, Sum
+
+		return productos.aggregate(
+			total_productos=Count("id"),
+			productos_bajo_stock=Count("id", filter=Q(stock__lt=10)),
+			productos_sin_stock=Count("id", filter=Q(stock=0)),
+			valor_inventario=Sum(
+				F("precio") * F("stock"),
+				output_field=DecimalField(max_digits=20, decimal_places=2),
+			),
+		)
+
 	def _generar_datos_productos(self):
 		"""Genera datos para reporte de productos."""
 		from producto.models import Producto
-		from django.db.models import Sum
 
 		productos = Producto.objects.filter(estado=True)
+		totales = self._totales_inventario(productos)
 
-		productos_data = []
-		for producto in productos:
-			productos_data.append(
-				{
-					"id": producto.id,
-					"nombre": producto.nombre,
-					"marca": producto.marca.nombre,
-					"categoria": producto.categoria.nombre,
-					"precio": float(producto.precio),
-					"stock": producto.stock,
-					"estado": "Activo" if producto.estado else "Inactivo",
-				}
-			)
+		# Una sola consulta con JOIN a marca y categoría, leída por bloques al renderizar
+		filas = productos.order_by("id").values_list(
+			"id", "nombre", "marca__nombre", "categoria__nombre", "precio", "stock"
+		)
+
+		def convertir(fila):
+			producto_id, nombre, marca, categoria, precio, stock = fila
+			return {
+				"id": producto_id,
+				"nombre": nombre,
+				"marca": marca,
+				"categoria": categoria,
+				"precio": float(precio),
+				"stock": stock,
+				"estado": "Activo",
+			}
 
 		return {
-			"total_productos": productos.count(),
-			"valor_inventario": float(sum(p.precio * p.stock for p in productos)),
-			"productos": productos_data,
+			"total_productos": totales["total_productos"],
+			"valor_inventario": float(totales["valor_inventario"] or 0),
+			"productos": FilasDiferidas(filas, convertir, totales["total_productos"]),
 		}
 
 	def _generar_datos_clientes(self):
-		"""Genera datos para reporte de clientes."""
+		"""
+		Genera datos para reporte de clientes desde el resumen de compras.
+		Las filas se leen por bloques al renderizar (``FilasDiferidas``).
+		"""
 		from users.models import CustomUser
-		from venta.models import Venta
-		from django.db.models import Sum, Count
-
-		clientes = CustomUser.objects.filter(rol__nombre__iexact="Cliente")
 
-		clientes_data = []
-		for cliente in clientes:
-			ventas = Venta.objects.filter(usuario=cliente, estado="pagado")
-			total_compras = ventas.aggregate(total=Sum("total"))["total"] or 0
-			cantidad_compras = ventas.count()
-
-			clientes_data.append(
-				{
-					"id": cliente.id,
-					"username": cliente.username,
-					"email": cliente.email,
-					"cantidad_compras": cantidad_compras,
-					"total_compras": float(total_compras),
-					"fecha_registro": cliente.date_joined.strftime("%d/%m/%Y"),
-				}
+		# Una sola consulta (LEFT JOIN a ResumenCliente) por recorrido
+		clientes = (
+			CustomUser.objects.filter(rol__nombre__iexact="Cliente")
+			.order_by("id")
+			.values(
+				"id",
+				"username",
+				"email",
+				"date_joined",
+				"resumen_compras__cantidad_compras",
+				"resumen_compras__total_gastado",
 			)
+		)
+		total_clientes = clientes.count()
+
+		def convertir(cliente):
+			return {
+				"id": cliente["id"],
+				"username": cliente["username"],
+				"email": cliente["email"],
+				"cantidad_compras": cliente["resumen_compras__cantidad_compras"] or 0,
+				"total_compras": float(cliente["resumen_compras__total_gastado"] or 0),
+				"fecha_registro": cliente["date_joined"].strftime("%d/%m/%Y"),
+			}
 
-		return {"total_clientes": clientes.count(), "clientes": clientes_data}
+		return {
+			"total_clientes": total_clientes,
+			"clientes": FilasDiferidas(clientes, convertir, total_clientes),
+		}
 
 	def _generar_datos_inventario(self):
 		"""Genera datos para reporte de inventario."""
 		from producto.models import Producto
-		from django.db.models import Sum
+		from producto.agotamiento import en_riesgo, DIAS_RIESGO
 
 		productos = Producto.objects.filter(estado=True)
+		totales = self._totales_inventario(productos)
 
-		# Productos con bajo stock (menos de 10 unidades)
-		bajo_stock = productos.filter(stock__lt=10)
-
-		# Productos sin stock
-		sin_stock = productos.filter(stock=0)
+		# Productos que se agotan pronto según su velocidad de venta (ver producto.agotamiento)
+		riesgo = list(en_riesgo())
 
 		return {
-			"total_productos": productos.count(),
-			"productos_bajo_stock": bajo_stock.count(),
-			"productos_sin_stock": sin_stock.count(),
-			"valor_total_inventario": float(sum(p.precio * p.stock for p in productos)),
-			"productos_bajo_stock_detalle": [
-				{"nombre": p.nombre, "stock": p.stock, "precio": float(p.precio)}
-				for p in bajo_stock
+			"total_productos": totales["total_productos"],
+			"productos_bajo_stock": totales["productos_bajo_stock"],
+			"productos_sin_stock": totales["productos_sin_stock"],
+			"valor_total_inventario": float(totales["valor_inventario"] or 0),
+			"productos_bajo_stock_detalle": FilasDiferidas(
+				productos.filter(stock__lt=10).order_by("id").values_list("nombre", "stock", "precio"),
+				lambda fila: {"nombre": fila[0], "stock": fila[1], "precio": float(fila[2])},
+				totales["productos_bajo_stock"],
+			),
+			"dias_riesgo_agotamiento": DIAS_RIESGO,
+			"productos_riesgo_agotamiento": len(riesgo),
+			"proyeccion_agotamiento_detalle": [
+				{
+					"nombre": proyeccion.producto.nombre,
+					"stock": proyeccion.stock,
+					"velocidad_diaria": proyeccion.velocidad_diaria,
+					"dias_hasta_agotamiento": proyeccion.dias_hasta_agotamiento,
+					"fecha_agotamiento": proyeccion.fecha_agotamiento.strftime("%d/%m/%Y"),
+				}
+				for proyeccion in riesgo
 			],
 		}
 
 	def _generar_datos_financiero(self, fecha_inicio=None, fecha_fin=None):
-		"""Genera datos para reporte financiero."""
-		from venta.models import Venta
-		from django.db.models import Sum, Count, Avg
+		"""Genera datos para reporte financiero desde el resumen diario de ventas."""
+		from venta.models import VentaDiaria
+		from django.db.models import Sum
 
-		ventas_query = Venta.objects.filter(estado="pagado")
+		resumen_query = VentaDiaria.objects.filter(estado="pagado")
 
 		if fecha_inicio:
-			ventas_query = ventas_query.filter(fecha__gte=fecha_inicio)
+			resumen_query = resumen_query.filter(fecha__gte=fecha_inicio)
 		if fecha_fin:
-			ventas_query = ventas_query.filter(fecha__lte=fecha_fin)
+			resumen_query = resumen_query.filter(fecha__lte=fecha_fin)
 
-		ingresos_totales = ventas_query.aggregate(total=Sum("total"))["total"] or 0
+		totales = resumen_query.aggregate(total=Sum("total"), cantidad=Sum("cantidad"))
+		ingresos_totales = totales["total"] or 0
+		cantidad_transacciones = totales["cantidad"] or 0
 
 		return {
 			"ingresos_totales": float(ingresos_totales),
-			"cantidad_transacciones": ventas_query.count(),
+			"cantidad_transacciones": cantidad_transacciones,
 			"ticket_promedio": float(
-				ingresos_totales / ventas_query.count()
-				if ventas_query.count() > 0
+				ingresos_totales / cantidad_transacciones
+				if cantidad_transacciones > 0
 				else 0
 			),
 			"periodo": {
@@ -19,6 +19,8 @@ class CustomUser(AbstractUser):
         blank=True,
         related_name="usuarios"
     )
+    # Marca de cambios (rol, username, email...) para la huella de reportes
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.username} ({self.rol.nombre if self.rol else 'Sin rol'})"
@@ -0,0 +1,84 @@
+"""
+Cancelación de ventas con restauración de inventario basada en conjuntos.
+
+En lugar de recorrer cada detalle y guardar cada producto, las cantidades se
+agrupan por producto en una sola consulta y el stock se restaura con
+``UPDATE ... SET stock = stock + CASE ...`` por bloques de productos.
+"""
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+from producto.models import Producto
+from .models import Venta, DetalleVenta
+from .resumenes import cambiar_estado_en_resumen, recalcular_resumen_clientes
+
+MAX_VENTAS_POR_LOTE = 1000
+PRODUCTOS_POR_UPDATE = 500
+
+
+def restaurar_stock(venta_ids):
+    """Devuelve al inventario las unidades vendidas en ``venta_ids``."""
+    cantidades = list(
+        DetalleVenta.objects.filter(venta_id__in=venta_ids)
+        .values('producto_id')
+        .annotate(cantidad=Sum('cantidad'))
+        .order_by('producto_id')
+        .values_list('producto_id', 'cantidad')
+    )
+
+    ahora = timezone.now()
+    for inicio in range(0, len(cantidades), PRODUCTOS_POR_UPDATE):
+        bloque = cantidades[inicio:inicio + PRODUCTOS_POR_UPDATE]
+        Producto.objects.filter(id__in=[producto_id for producto_id, _ in bloque]).update(
+            stock=F('stock') + Case(
+                *[When(id=producto_id, then=Value(cantidad)) for producto_id, cantidad in bloque],
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+            fecha_actualizacion=ahora,
+        )
+    return len(cantidades)
+
+
+def cancelar_ventas(venta_ids):
+    """
+    Cancela las ventas indicadas en una sola transacción: restaura stock,
+    actualiza los resúmenes y marca las ventas como canceladas.
+
+    Devuelve ``(canceladas, omitidas)``: la lista de ventas canceladas y un
+    diccionario ``{venta_id: motivo}`` con las que no se pudieron cancelar.
+    """
+    venta_ids = list(dict.fromkeys(venta_ids))
+
+    with transaction.atomic():
+        ventas = list(
+            Venta.objects.select_for_update().filter(id__in=venta_ids).order_by('id')
+        )
+        encontradas = {venta.id for venta in ventas}
+        omitidas = {
+            venta_id: 'Venta no encontrada'
+            for venta_id in venta_ids if venta_id not in encontradas
+        }
+        omitidas.update({
+            venta.id: 'La venta ya está cancelada'
+            for venta in ventas if venta.estado == 'cancelado'
+        })
+
+        canceladas = [venta for venta in ventas if venta.estado != 'cancelado']
+        if not canceladas:
+            return [], omitidas
+
+        ids = [venta.id for venta in canceladas]
+        restaurar_stock(ids)
+
+        # Los resúmenes necesitan el estado anterior de cada venta
+        cambiar_estado_en_resumen(canceladas, 'cancelado')
+        Venta.objects.filter(id__in=ids).update(
+            estado='cancelado', fecha_actualizacion=timezone.now()
+        )
+        for venta in canceladas:
+            venta.estado = 'cancelado'
+        recalcular_resumen_clientes({venta.usuario_id for venta in canceladas})
+
+    return canceladas, omitidas
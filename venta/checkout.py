@@ -0,0 +1,101 @@
+"""
+Registro en bloque de los detalles de una venta (checkout).
+
+En lugar de consultar, insertar y guardar cada línea del carrito por separado,
+se trabaja con conjuntos: una sola consulta bloquea todos los productos, los
+detalles y garantías se insertan con ``bulk_create`` y el stock se descuenta
+con un ``UPDATE`` condicional por producto.
+"""
+from collections import OrderedDict
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from producto.models import Producto
+from .models import DetalleVenta, Garantia
+
+
+def agrupar_carrito(productos):
+    """
+    Normaliza las líneas del carrito a ``{producto_id: cantidad}``.
+    Si un producto aparece varias veces, sus cantidades se suman.
+    """
+    cantidades = OrderedDict()
+    for item in productos:
+        producto_id = int(item['producto_id'])
+        cantidad = int(item['cantidad'])
+        if cantidad < 1:
+            raise ValueError(f"Cantidad inválida para el producto {producto_id}")
+        cantidades[producto_id] = cantidades.get(producto_id, 0) + cantidad
+    return cantidades
+
+
+def registrar_detalles_venta(venta, productos):
+    """
+    Crea los detalles y garantías de ``venta`` y descuenta el inventario.
+
+    Todas las operaciones se ejecutan en un bloque atómico propio, de modo que
+    un producto inexistente o sin stock revierte el checkout completo.
+    Devuelve la lista de ``DetalleVenta`` creados.
+    """
+    cantidades = agrupar_carrito(productos)
+
+    with transaction.atomic():
+        # Una sola consulta para todos los productos, bloqueados en orden de id
+        # para evitar interbloqueos entre checkouts concurrentes.
+        bloqueados = {
+            p.id: p
+            for p in Producto.objects.select_for_update()
+            .filter(id__in=cantidades.keys())
+            .order_by('id')
+        }
+
+        faltantes = [pid for pid in cantidades if pid not in bloqueados]
+        if faltantes:
+            raise Producto.DoesNotExist(
+                f"Producto no encontrado: {', '.join(str(pid) for pid in faltantes)}"
+            )
+
+        fecha_inicio = datetime.today().date()
+        detalles = []
+        garantias = []
+
+        for producto_id, cantidad in cantidades.items():
+            producto = bloqueados[producto_id]
+            if producto.stock < cantidad:
+                raise ValueError(f"Stock insuficiente para {producto.nombre}")
+
+            detalles.append(DetalleVenta(
+                venta=venta,
+                producto=producto,
+                cantidad=cantidad,
+                precio_unitario=producto.precio,
+                subtotal=producto.precio * cantidad,
+            ))
+            garantias.append(Garantia(
+                producto=producto,
+                venta=venta,
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_inicio + relativedelta(months=producto.garantia),
+                estado='activa',
+            ))
+
+        detalles = DetalleVenta.objects.bulk_create(detalles)
+        Garantia.objects.bulk_create(garantias)
+
+        # Descuento condicional: si otra transacción dejó el stock por debajo
+        # de la cantidad pedida, el UPDATE no afecta filas y se revierte todo.
+        ahora = timezone.now()
+        for producto_id, cantidad in cantidades.items():
+            actualizados = Producto.objects.filter(
+                id=producto_id, stock__gte=cantidad
+            ).update(stock=F('stock') - cantidad, fecha_actualizacion=ahora)
+            if not actualizados:
+                raise ValueError(
+                    f"Stock insuficiente para {bloqueados[producto_id].nombre}"
+                )
+
+    return detalles
@@ -0,0 +1,35 @@
+"""
+Querysets de ventas con un presupuesto fijo de consultas.
+
+``VentaSerializer`` anida ``DetalleVentaSerializer`` → ``ProductoSerializer``,
+que a su vez lee ``marca.nombre`` y ``categoria.nombre``. Sin precarga eso
+dispara varias consultas por cada venta y por cada detalle.
+"""
+from django.db.models import Prefetch
+
+from .models import Venta, DetalleVenta
+
+# Consultas necesarias para serializar cualquier cantidad de ventas con
+# ``ventas_con_detalles``: una para las ventas y otra para todos sus detalles
+# (con producto, marca y categoría en el mismo JOIN).
+CONSULTAS_LISTADO_VENTAS = 2
+
+
+def detalles_con_producto():
+    """Detalles de venta con producto, marca y categoría en un solo JOIN."""
+    return DetalleVenta.objects.select_related(
+        'producto__marca', 'producto__categoria'
+    ).order_by('id')
+
+
+def ventas_con_detalles(queryset=None):
+    """
+    Agrega a ``queryset`` la precarga que necesita ``VentaSerializer``.
+    El número de consultas queda en ``CONSULTAS_LISTADO_VENTAS`` sin importar
+    cuántas ventas o detalles se devuelvan.
+    """
+    if queryset is None:
+        queryset = Venta.objects.all()
+    return queryset.prefetch_related(
+        Prefetch('detalles', queryset=detalles_con_producto())
+    )
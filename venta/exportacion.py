@@ -0,0 +1,86 @@
+"""
+Exportación masiva de ventas y sus detalles en CSV o NDJSON.
+
+Las filas se leen con un cursor del lado del servidor
+(``QuerySet.iterator(chunk_size=...)``) y se escriben a medida que llegan,
+por lo que la memoria usada no depende del tamaño de la exportación.
+"""
+import csv
+import json
+from itertools import groupby
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+TAMANO_BLOQUE = 2000
+
+CAMPOS_VENTA = ['id', 'fecha', 'usuario_id', 'usuario__username', 'estado', 'total']
+CAMPOS_DETALLE = [
+    'detalles__id',
+    'detalles__producto_id',
+    'detalles__producto__nombre',
+    'detalles__cantidad',
+    'detalles__precio_unitario',
+    'detalles__subtotal',
+]
+
+ENCABEZADO_CSV = [
+    'venta_id', 'fecha', 'usuario_id', 'usuario', 'estado', 'total',
+    'detalle_id', 'producto_id', 'producto', 'cantidad', 'precio_unitario', 'subtotal',
+]
+
+
+class _Eco:
+    """Pseudo-buffer para ``csv.writer``: devuelve la línea en lugar de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def filas_exportacion(ventas):
+    """
+    Una fila por detalle de venta (o una sola fila con detalle vacío si la
+    venta no tiene detalles), ordenadas por venta.
+    """
+    return (
+        ventas.order_by('id', 'detalles__id')
+        .values_list(*CAMPOS_VENTA, *CAMPOS_DETALLE)
+        .iterator(chunk_size=TAMANO_BLOQUE)
+    )
+
+
+def exportar_csv(filas):
+    """Genera el CSV línea por línea."""
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(ENCABEZADO_CSV)
+    for fila in filas:
+        fila = list(fila)
+        fila[1] = fila[1].isoformat()
+        yield escritor.writerow(fila)
+
+
+def exportar_ndjson(filas):
+    """Genera un objeto JSON por venta y por línea, con sus detalles anidados."""
+    columnas_detalle = [campo.replace('detalles__', '') for campo in CAMPOS_DETALLE]
+    columnas_detalle[2] = 'producto'
+    n = len(CAMPOS_VENTA)
+
+    for cabecera, grupo in groupby(filas, key=lambda fila: fila[:n]):
+        venta_id, fecha, usuario_id, usuario, estado, total = cabecera
+        detalles = [
+            dict(zip(columnas_detalle, fila[n:]))
+            for fila in grupo
+            if fila[n] is not None
+        ]
+        yield json.dumps(
+            {
+                'id': venta_id,
+                'fecha': fecha,
+                'usuario_id': usuario_id,
+                'usuario': usuario,
+                'estado': estado,
+                'total': total,
+                'detalles': detalles,
+            },
+            cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+        ) + '\n'
@@ -0,0 +1,22 @@
+"""
+Caducidad de garantías.
+
+Las garantías se crean ``activa`` en el checkout; el barrido las marca como
+``caducada`` con un único ``UPDATE`` sobre el índice ``(estado, fecha_fin)``,
+de modo que la cobertura se consulta por estado sin comparar fechas fila a fila.
+"""
+from django.utils import timezone
+
+from .models import Garantia
+
+
+def garantias_vigentes(hoy=None):
+    """Garantías que cubren al día ``hoy`` (por defecto, la fecha local actual)."""
+    hoy = hoy or timezone.localdate()
+    return Garantia.objects.filter(estado='activa', fecha_fin__gte=hoy)
+
+
+def caducar_garantias(hoy=None):
+    """Marca como caducadas las garantías activas vencidas. Devuelve cuántas cambió."""
+    hoy = hoy or timezone.localdate()
+    return Garantia.objects.filter(estado='activa', fecha_fin__lt=hoy).update(estado='caducada')
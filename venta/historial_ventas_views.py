@@ -2,11 +2,17 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Count, Q
+from django.db import transaction
+from django.db.models import Sum, F
 from django.utils import timezone
 from datetime import timedelta
-from venta.models import Venta, DetalleVenta
+from django.http import StreamingHttpResponse
+from venta.models import Venta, DetalleVenta, VentaDiaria, ResumenCliente
 from venta.serializers import VentaSerializer
+from venta.consultas import ventas_con_detalles
+from venta.paginacion import VentaCursorPagination
+from venta.exportacion import filas_exportacion, exportar_csv, exportar_ndjson
+from venta.cancelacion import cancelar_ventas, MAX_VENTAS_POR_LOTE
 from bitacora.models import Bitacora
 from users.views import get_client_ip
 
@@ -16,14 +22,18 @@ class HistorialVentasViewSet(viewsets.ReadOnlyModelViewSet):
     ViewSet para gestionar el historial de ventas.
     
     Endpoints disponibles:
-    - GET /api/historial-ventas/ - Listar todas las ventas
+    - GET /api/historial-ventas/ - Listar todas las ventas (paginado por cursor)
     - GET /api/historial-ventas/{id}/ - Ver detalle de una venta
     - GET /api/historial-ventas/mis-compras/ - Ver compras del usuario autenticado
     - GET /api/historial-ventas/estadisticas/ - Ver estadísticas de ventas
     - GET /api/historial-ventas/por-periodo/ - Filtrar ventas por período
+    - GET /api/historial-ventas/exportar/ - Exportar ventas y detalles (CSV / NDJSON)
+    - POST /api/historial-ventas/{id}/cancelar/ - Cancelar una venta
+    - POST /api/historial-ventas/cancelar-lote/ - Cancelar varias ventas (admin)
     """
     serializer_class = VentaSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = VentaCursorPagination
 
     def get_queryset(self):
         """
@@ -34,15 +44,34 @@ class HistorialVentasViewSet(viewsets.ReadOnlyModelViewSet):
         user = self.request.user
         
         if user.is_superuser or (user.rol and user.rol.nombre.lower() in ['administrador', 'admin']):
-            return Venta.objects.all().order_by('-fecha')
+            return ventas_con_detalles(Venta.objects.all().order_by('-fecha'))
         
-        return Venta.objects.filter(usuario=user).order_by('-fecha')
+        return ventas_con_detalles(Venta.objects.filter(usuario=user).order_by('-fecha'))
 
     def list(self, request, *args, **kwargs):
-        """Lista las ventas con filtros opcionales."""
-        queryset = self.get_queryset()
+        """
+        Lista las ventas con filtros opcionales, paginadas por cursor.
+        
+        Query params opcionales:
+        - cursor: cursor devuelto en `next`/`previous`
+        - page_size: ventas por página (default: 50, máximo: 500)
+        """
+        queryset = self._aplicar_filtros(self.get_queryset(), request)
+        
+        # Paginación
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         
-        # Filtros opcionales
+        serializer = self.get_serializer(queryset, many=True)
+        return Response({
+            'count': queryset.count(),
+            'ventas': serializer.data
+        })
+
+    def _aplicar_filtros(self, queryset, request):
+        """Filtros opcionales comunes: estado, fecha_desde, fecha_hasta y usuario_id (admin)."""
         estado = request.query_params.get('estado')
         fecha_desde = request.query_params.get('fecha_desde')
         fecha_hasta = request.query_params.get('fecha_hasta')
@@ -61,17 +90,7 @@ class HistorialVentasViewSet(viewsets.ReadOnlyModelViewSet):
                           (request.user.rol and request.user.rol.nombre.lower() in ['administrador', 'admin'])):
             queryset = queryset.filter(usuario_id=usuario_id)
         
-        # Paginación
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(queryset, many=True)
-        return Response({
-            'count': queryset.count(),
-            'ventas': serializer.data
-        })
+        return queryset
 
     @action(detail=False, methods=['get'], url_path='mis-compras')
     def mis_compras(self, request):
@@ -87,29 +106,25 @@ class HistorialVentasViewSet(viewsets.ReadOnlyModelViewSet):
         limite = int(request.query_params.get('limite', 20))
         estado = request.query_params.get('estado')
         
-        ventas = Venta.objects.filter(usuario=usuario).order_by('-fecha')[:limite]
+        ventas = Venta.objects.filter(usuario=usuario).order_by('-fecha')
         
         if estado:
             ventas = ventas.filter(estado=estado)
         
-        serializer = self.get_serializer(ventas, many=True)
+        ventas = ventas_con_detalles(ventas)[:limite]
         
-        # Calcular totales
-        total_gastado = Venta.objects.filter(
-            usuario=usuario,
-            estado='pagado'
-        ).aggregate(total=Sum('total'))['total'] or 0
+        serializer = self.get_serializer(ventas, many=True)
         
-        cantidad_compras = Venta.objects.filter(
-            usuario=usuario,
-            estado='pagado'
-        ).count()
+        # Totales desde el resumen de compras del cliente
+        resumen = ResumenCliente.objects.filter(usuario=usuario).first()
         
         return Response({
             'resumen': {
-                'total_gastado': float(total_gastado),
-                'cantidad_compras': cantidad_compras,
-                'ticket_promedio': float(total_gastado / cantidad_compras) if cantidad_compras > 0 else 0
+                'total_gastado': float(resumen.total_gastado) if resumen else 0.0,
+                'cantidad_compras': resumen.cantidad_compras if resumen else 0,
+                'ticket_promedio': float(resumen.ticket_promedio) if resumen else 0,
+                'primera_compra': resumen.primera_compra if resumen else None,
+                'ultima_compra': resumen.ultima_compra if resumen else None,
             },
             'compras': serializer.data
         }, status=status.HTTP_200_OK)
@@ -138,7 +153,7 @@ class HistorialVentasViewSet(viewsets.ReadOnlyModelViewSet):
         
         # Definir rango de fechas según el período
         if periodo == 'hoy':
-            fecha_desde = hoy.replace(hour=0, minute=0, second=0, microsecond=0)
+            fecha_desde = timezone.localtime(hoy).replace(hour=0, minute=0, second=0, microsecond=0)
         elif periodo == 'semana':
             fecha_desde = hoy - timedelta(days=7)
         elif periodo == 'mes':
@@ -148,20 +163,21 @@ class HistorialVentasViewSet(viewsets.ReadOnlyModelViewSet):
         else:
             fecha_desde = None
         
-        # Filtrar ventas por período
-        ventas_query = Venta.objects.filter(estado='pagado')
+        # Totales del período desde el resumen diario
+        resumen_query = VentaDiaria.objects.filter(estado='pagado')
+        detalles_query = DetalleVenta.objects.filter(venta__estado='pagado')
         if fecha_desde:
-            ventas_query = ventas_query.filter(fecha__gte=fecha_desde)
+            resumen_query = resumen_query.filter(fecha__gte=timezone.localdate(fecha_desde))
+            detalles_query = detalles_query.filter(venta__fecha__gte=fecha_desde)
         
         # Calcular estadísticas
-        total_ventas = ventas_query.aggregate(total=Sum('total'))['total'] or 0
-        cantidad_ventas = ventas_query.count()
+        totales = resumen_query.aggregate(total=Sum('total'), cantidad=Sum('cantidad'))
+        total_ventas = totales['total'] or 0
+        cantidad_ventas = totales['cantidad'] or 0
         ticket_promedio = total_ventas / cantidad_ventas if cantidad_ventas > 0 else 0
         
         # Productos más vendidos
-        productos_vendidos = DetalleVenta.objects.filter(
-            venta__in=ventas_query
-        ).values(
+        productos_vendidos = detalles_query.values(
             'producto__nombre'
         ).annotate(
             total_vendido=Sum('cantidad'),
@@ -169,12 +185,9 @@ class HistorialVentasViewSet(viewsets.ReadOnlyModelViewSet):
         ).order_by('-total_vendido')[:10]
         
         # Ventas por día
-        ventas_por_dia = ventas_query.extra(
-            select={'dia': 'DATE(fecha)'}
-        ).values('dia').annotate(
-            cantidad=Count('id'),
-            total=Sum('total')
-        ).order_by('dia')
+        ventas_por_dia = resumen_query.filter(cantidad__gt=0).order_by('fecha').values(
+            'cantidad', 'total', dia=F('fecha')
+        )
         
         # Registrar en bitácora
         Bitacora.objects.create(
@@ -195,6 +208,50 @@ class HistorialVentasViewSet(viewsets.ReadOnlyModelViewSet):
             'ventas_por_dia': list(ventas_por_dia)
         }, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['get'], url_path='exportar')
+    def exportar(self, request):
+        """
+        Exporta las ventas con sus detalles en streaming.
+        Solo accesible para administradores.
+        
+        GET /api/historial-ventas/exportar/?formato=csv
+        Query params opcionales:
+        - formato: 'csv' (default, una fila por detalle) o 'ndjson' (una venta por línea)
+        - estado, fecha_desde, fecha_hasta, usuario_id: mismos filtros que el listado
+        """
+        user = request.user
+        
+        if not (user.is_superuser or (user.rol and user.rol.nombre.lower() in ['administrador', 'admin'])):
+            return Response(
+                {'error': 'No tiene permisos para exportar ventas'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        formato = request.query_params.get('formato', 'csv')
+        if formato not in ('csv', 'ndjson'):
+            return Response(
+                {'error': "Formato no soportado. Use 'csv' o 'ndjson'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        filas = filas_exportacion(self._aplicar_filtros(Venta.objects.all(), request))
+        
+        Bitacora.objects.create(
+            usuario=user,
+            accion=f"Exportó historial de ventas en formato {formato}",
+            ip=get_client_ip(request),
+            estado=True
+        )
+        
+        if formato == 'csv':
+            response = StreamingHttpResponse(exportar_csv(filas), content_type='text/csv; charset=utf-8')
+        else:
+            response = StreamingHttpResponse(exportar_ndjson(filas), content_type='application/x-ndjson')
+        
+        nombre = f"ventas_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{formato}"
+        response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+        return response
+
     @action(detail=False, methods=['get'], url_path='por-periodo')
     def por_periodo(self, request):
         """
@@ -252,34 +309,87 @@ class HistorialVentasViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        if venta.estado == 'cancelado':
+        # Inventario, resúmenes, estado y bitácora en una sola transacción; el
+        # estado se decide con la venta bloqueada (dos cancelaciones simultáneas
+        # no pueden ambas tener éxito)
+        with transaction.atomic():
+            canceladas, omitidas = cancelar_ventas([venta.id])
+            if canceladas:
+                Bitacora.objects.create(
+                    usuario=request.user,
+                    accion=f"Canceló venta #{venta.id} y restauró inventario",
+                    ip=get_client_ip(request),
+                    estado=True
+                )
+        
+        if not canceladas:
             return Response(
-                {'error': 'La venta ya está cancelada'},
+                {'error': omitidas.get(venta.id, 'La venta ya está cancelada')},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Restaurar inventario
-        from producto.models import Producto
-        for detalle in venta.detalles.all():
-            producto = detalle.producto
-            producto.stock += detalle.cantidad
-            producto.save()
-        
-        # Actualizar estado de la venta
-        venta.estado = 'cancelado'
-        venta.save()
-        
-        # Registrar en bitácora
-        Bitacora.objects.create(
-            usuario=request.user,
-            accion=f"Canceló venta #{venta.id} y restauró inventario",
-            ip=get_client_ip(request),
-            estado=True
-        )
-        
+        venta.refresh_from_db()
         serializer = self.get_serializer(venta)
         
         return Response({
             'mensaje': 'Venta cancelada exitosamente. Inventario restaurado.',
             'venta': serializer.data
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='cancelar-lote')
+    def cancelar_lote(self, request):
+        """
+        Cancela varias ventas en una sola transacción y restaura el inventario.
+        Solo accesible para administradores.
+        
+        POST /api/historial-ventas/cancelar-lote/
+        Body: {"ventas": [1, 2, 3]}
+        """
+        user = request.user
+        
+        if not (user.is_superuser or (user.rol and user.rol.nombre.lower() in ['administrador', 'admin'])):
+            return Response(
+                {'error': 'No tiene permisos para cancelar ventas en lote'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        venta_ids = request.data.get('ventas')
+        if not isinstance(venta_ids, list) or not venta_ids:
+            return Response(
+                {'error': 'Debe enviar una lista de ids en "ventas"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            venta_ids = [int(venta_id) for venta_id in venta_ids]
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'Los ids de venta deben ser números enteros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(venta_ids) > MAX_VENTAS_POR_LOTE:
+            return Response(
+                {'error': f'No se pueden cancelar más de {MAX_VENTAS_POR_LOTE} ventas por solicitud'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with transaction.atomic():
+            canceladas, omitidas = cancelar_ventas(venta_ids)
+            
+            # Un único registro en bitácora para todo el lote, en la misma transacción
+            if canceladas:
+                ids_texto = ', '.join(f"#{venta.id}" for venta in canceladas)
+                accion = f"Canceló {len(canceladas)} ventas en lote y restauró inventario: {ids_texto}"
+                Bitacora.objects.create(
+                    usuario=user,
+                    accion=accion if len(accion) <= 255 else accion[:252] + '...',
+                    ip=get_client_ip(request),
+                    estado=True
+                )
+        
+        return Response({
+            'mensaje': f'{len(canceladas)} ventas canceladas. Inventario restaurado.',
+            'canceladas': [venta.id for venta in canceladas],
+            'omitidas': [
+                {'id': venta_id, 'motivo': motivo} for venta_id, motivo in omitidas.items()
+            ]
+        }, status=status.HTTP_200_OK)
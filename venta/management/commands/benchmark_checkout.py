@@ -0,0 +1,139 @@
+"""
+Benchmark del checkout: compara el registro línea por línea (implementación
+anterior de ``registrar_venta``) con el registro en bloque de ``venta.checkout``.
+
+Uso:
+    python manage.py benchmark_checkout
+    python manage.py benchmark_checkout --lineas 1 10 50 --repeticiones 20
+
+Todos los datos se crean dentro de una transacción que se revierte al final,
+por lo que la base de datos queda intacta.
+"""
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from categoria.models import Categoria
+from marca.models import Marca
+from producto.models import Producto
+from venta.checkout import registrar_detalles_venta
+from venta.models import Venta, DetalleVenta, Garantia
+
+
+def checkout_por_linea(venta, productos):
+    """Reproduce el flujo anterior: una consulta, inserción y save() por línea."""
+    for item in productos:
+        producto = Producto.objects.get(id=item['producto_id'])
+        cantidad = int(item['cantidad'])
+
+        if producto.stock < cantidad:
+            raise ValueError(f"Stock insuficiente para {producto.nombre}")
+
+        DetalleVenta.objects.create(
+            venta=venta,
+            producto=producto,
+            cantidad=cantidad,
+            precio_unitario=producto.precio,
+            subtotal=producto.precio * cantidad,
+        )
+        fecha_inicio = datetime.today().date()
+        Garantia.objects.create(
+            producto=producto,
+            venta=venta,
+            fecha_fin=fecha_inicio + relativedelta(months=producto.garantia),
+            fecha_inicio=fecha_inicio,
+            estado='activa',
+        )
+        producto.stock -= cantidad
+        producto.save()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Mide consultas y latencia del checkout por línea vs. en bloque."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lineas', nargs='+', type=int, default=[1, 10, 50],
+                            help="Tamaños de carrito a medir (default: 1 10 50)")
+        parser.add_argument('--repeticiones', type=int, default=10,
+                            help="Repeticiones por escenario (default: 10)")
+
+    def handle(self, *args, **options):
+        lineas = options['lineas']
+        repeticiones = options['repeticiones']
+        resultados = []
+
+        try:
+            with transaction.atomic():
+                usuario, productos = self._preparar_datos(max(lineas))
+                for n in lineas:
+                    carrito = [
+                        {'producto_id': p.id, 'cantidad': 1} for p in productos[:n]
+                    ]
+                    for nombre, funcion in (
+                        ('por_linea', checkout_por_linea),
+                        ('en_bloque', registrar_detalles_venta),
+                    ):
+                        consultas, tiempos = self._medir(
+                            usuario, carrito, funcion, repeticiones
+                        )
+                        resultados.append((n, nombre, consultas, tiempos))
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        self.stdout.write(
+            f"{'lineas':>6}  {'modo':<10}  {'consultas':>9}  {'mediana ms':>10}  {'p95 ms':>8}"
+        )
+        for n, nombre, consultas, tiempos in resultados:
+            tiempos = sorted(tiempos)
+            p95 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))]
+            self.stdout.write(
+                f"{n:>6}  {nombre:<10}  {consultas:>9}  "
+                f"{statistics.median(tiempos) * 1000:>10.2f}  {p95 * 1000:>8.2f}"
+            )
+
+    def _preparar_datos(self, cantidad_productos):
+        sufijo = uuid.uuid4().hex[:8]
+        usuario = get_user_model().objects.create_user(
+            username=f"bench_{sufijo}",
+            email=f"bench_{sufijo}@example.com",
+            password=uuid.uuid4().hex,
+        )
+        marca = Marca.objects.create(nombre=f"Bench {sufijo}")
+        categoria = Categoria.objects.create(nombre=f"Bench {sufijo}")
+        Producto.objects.bulk_create([
+            Producto(
+                nombre=f"Producto bench {i}",
+                precio=100,
+                precio_con_descuento=100,
+                stock=1_000_000,
+                garantia=12,
+                marca=marca,
+                categoria=categoria,
+            )
+            for i in range(cantidad_productos)
+        ])
+        return usuario, list(Producto.objects.filter(marca=marca).order_by('id'))
+
+    def _medir(self, usuario, carrito, funcion, repeticiones):
+        tiempos = []
+        consultas = 0
+        for _ in range(repeticiones):
+            venta = Venta.objects.create(usuario=usuario, total=len(carrito) * 100, estado='pagado')
+            with CaptureQueriesContext(connection) as contexto:
+                inicio = time.perf_counter()
+                funcion(venta, carrito)
+                tiempos.append(time.perf_counter() - inicio)
+            consultas = len(contexto.captured_queries)
+        return consultas, tiempos
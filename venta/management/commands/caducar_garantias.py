@@ -0,0 +1,33 @@
+"""
+Marca como caducadas las garantías cuya fecha de fin ya pasó.
+
+Uso:
+    python manage.py caducar_garantias                    # una pasada (cron)
+    python manage.py caducar_garantias --intervalo 3600   # programador en proceso
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from venta.garantias import caducar_garantias
+
+
+class Command(BaseCommand):
+    help = "Caduca las garantías vencidas con un único UPDATE indexado."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intervalo', type=float, default=0,
+                            help="Segundos entre barridos; 0 ejecuta una sola vez (default: 0)")
+
+    def handle(self, *args, **options):
+        intervalo = options['intervalo']
+
+        while True:
+            close_old_connections()
+            caducadas = caducar_garantias()
+            self.stdout.write(self.style.SUCCESS(f"✅ {caducadas} garantías caducadas"))
+
+            if intervalo <= 0:
+                break
+            time.sleep(intervalo)
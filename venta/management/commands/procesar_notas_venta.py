@@ -0,0 +1,45 @@
+"""
+Worker local que genera las notas de venta en PDF encoladas por el checkout.
+
+Uso:
+    python manage.py procesar_notas_venta             # corre indefinidamente
+    python manage.py procesar_notas_venta --una-vez   # vacía la cola y termina
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from venta.notas import procesar_pendientes
+
+
+class Command(BaseCommand):
+    help = "Procesa la cola de notas de venta pendientes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=20,
+                            help="Notas a tomar por iteración (default: 20)")
+        parser.add_argument('--intervalo', type=float, default=2.0,
+                            help="Segundos de espera cuando la cola está vacía (default: 2)")
+        parser.add_argument('--una-vez', action='store_true',
+                            help="Procesa lo pendiente y termina")
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        intervalo = options['intervalo']
+        total = 0
+
+        while True:
+            close_old_connections()
+            procesadas = procesar_pendientes(lote)
+            total += procesadas
+
+            if procesadas:
+                self.stdout.write(f"🧾 {procesadas} notas de venta procesadas")
+                continue
+
+            if options['una_vez']:
+                break
+            time.sleep(intervalo)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Cola vacía. Total procesadas: {total}"))
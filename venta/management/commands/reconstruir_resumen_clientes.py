@@ -0,0 +1,20 @@
+"""
+Reconstruye la tabla ``ResumenCliente`` (compras pagadas por cliente).
+
+Uso:
+    python manage.py reconstruir_resumen_clientes
+
+Necesario una vez después de desplegar el resumen, o si se cargan ventas
+por fuera de la API (por ejemplo con ``poblar.py``).
+"""
+from django.core.management.base import BaseCommand
+
+from venta.resumenes import reconstruir_resumen_clientes
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el resumen de compras por cliente (ResumenCliente)."
+
+    def handle(self, *args, **options):
+        filas = reconstruir_resumen_clientes()
+        self.stdout.write(self.style.SUCCESS(f"✅ Resumen de clientes reconstruido: {filas} clientes"))
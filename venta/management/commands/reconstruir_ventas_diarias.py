@@ -0,0 +1,20 @@
+"""
+Reconstruye la tabla de resumen diario ``VentaDiaria`` desde cero.
+
+Uso:
+    python manage.py reconstruir_ventas_diarias
+
+Necesario una vez después de desplegar el resumen, o si se cargan ventas
+por fuera de la API (por ejemplo con ``poblar.py``).
+"""
+from django.core.management.base import BaseCommand
+
+from venta.resumenes import reconstruir_ventas_diarias
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el resumen diario de ventas (VentaDiaria)."
+
+    def handle(self, *args, **options):
+        filas = reconstruir_ventas_diarias()
+        self.stdout.write(self.style.SUCCESS(f"✅ Resumen diario reconstruido: {filas} filas"))
@@ -17,6 +17,15 @@ class Venta(models.Model):
     fecha = models.DateTimeField(auto_now_add=True)
     total = models.DecimalField(max_digits=10, decimal_places=2)
     estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente')
+    # Los .update() masivos deben asignarlo explícitamente (marca de agua de reportes)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Paginación por cursor del historial (ver venta.paginacion)
+            models.Index(fields=['fecha', 'id'], name='venta_fecha_id_idx'),
+            models.Index(fields=['usuario', 'fecha', 'id'], name='venta_usuario_fecha_id_idx'),
+        ]
 
     def __str__(self):
         return f"Venta #{self.id} - {self.usuario.username}"
@@ -40,8 +49,79 @@ class Garantia(models.Model):
     fecha_inicio = models.DateField(auto_now_add=True)
     fecha_fin = models.DateField()
     estado = models.CharField(max_length=50, choices=[('activa', 'Activa'), ('caducada', 'Caducada')])
-  
 
+    class Meta:
+        indexes = [
+            # Barrido de caducadas y verificación de garantías vigentes (venta.garantias)
+            models.Index(fields=['estado', 'fecha_fin'], name='garantia_estado_fin_idx'),
+        ]
+
+    def __str__(self):
+        return f"Garantía de {self.producto.nombre} - {self.estado}"
+
+class NotaVenta(models.Model):
+    """
+    Trabajo en cola para generar el PDF de la nota de venta fuera del request.
+    El comando ``procesar_notas_venta`` toma los pendientes y guarda el archivo.
+    """
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('lista', 'Lista'),
+        ('error', 'Error'),
+    ]
+
+    venta = models.OneToOneField(Venta, on_delete=models.CASCADE, related_name='nota')
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente', db_index=True)
+    archivo = models.CharField(max_length=255, blank=True, default='')
+    intentos = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Nota de venta #{self.venta_id} - {self.estado}"
+
+
+class VentaDiaria(models.Model):
+    """
+    Resumen diario de ventas por estado (cantidad, ingresos y unidades).
+    Se mantiene de forma incremental desde venta.resumenes y se puede
+    reconstruir con ``python manage.py reconstruir_ventas_diarias``.
+    """
+    fecha = models.DateField()
+    estado = models.CharField(max_length=20, choices=Venta.ESTADO_CHOICES)
+    cantidad = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    unidades = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['fecha', 'estado']
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'estado'], name='venta_diaria_fecha_estado_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} ({self.estado}): {self.cantidad} ventas - {self.total}"
+
+
+class ResumenCliente(models.Model):
+    """
+    Resumen desnormalizado de las compras pagadas de cada cliente.
+    Se mantiene desde venta.resumenes y se puede reconstruir con
+    ``python manage.py reconstruir_resumen_clientes``.
+    """
+    usuario = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='resumen_compras',
+    )
+    total_gastado = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cantidad_compras = models.IntegerField(default=0)
+    primera_compra = models.DateTimeField(null=True, blank=True)
+    ultima_compra = models.DateTimeField(null=True, blank=True)
+    ticket_promedio = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
     def __str__(self):
-        return f"Garantía de {self.producto.nombre} - {self.estado}"
\ No newline at end of file
+        return f"Resumen de compras de {self.usuario_id}: {self.cantidad_compras} - {self.total_gastado}"
@@ -0,0 +1,139 @@
+"""
+Generación diferida de las notas de venta en PDF.
+
+``registrar_venta`` solo encola un ``NotaVenta``; el comando
+``procesar_notas_venta`` renderiza los pendientes con reportlab y los guarda
+en el ``FileSystemStorage``, fuera del request y de la transacción del checkout.
+"""
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from .models import NotaVenta, Venta
+
+MAX_INTENTOS = 3
+# Una nota que sigue en 'procesando' pasado este tiempo se da por abandonada
+# (el worker murió) y se vuelve a reclamar
+TIEMPO_MAXIMO_PROCESANDO = timedelta(minutes=10)
+
+
+# Función para generar el PDF de la nota de venta
+def generar_nota_venta(venta):
+    buffer = BytesIO()
+
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter  # Definir tamaño de página (carta)
+
+    # Título
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(30, height - 40, f"Nota de Venta #{venta.id}")
+
+    # Detalles de la venta
+    c.setFont("Helvetica", 12)
+    c.drawString(30, height - 60, f"Fecha: {venta.fecha}")
+    c.drawString(30, height - 80, f"Cliente: {venta.usuario.username}")
+    c.drawString(30, height - 100, f"Total: {venta.total} USD")
+
+    # Detalle de los productos
+    y_position = height - 140
+    c.drawString(30, y_position, "Productos:")
+    y_position -= 20
+
+    for detalle in venta.detalles.all():
+        producto = detalle.producto
+        c.drawString(30, y_position, f"{producto.nombre} - Cantidad: {detalle.cantidad} - Subtotal: {detalle.subtotal}")
+        y_position -= 20
+
+    # Finalizar el PDF
+    c.showPage()
+    c.save()
+
+    # Regresar el archivo PDF generado
+    buffer.seek(0)
+    return buffer
+
+
+def encolar_nota_venta(venta):
+    """Crea (o reutiliza) el trabajo de generación de la nota de ``venta``."""
+    nota, _ = NotaVenta.objects.get_or_create(venta=venta)
+    return nota
+
+
+def url_nota_venta(nota):
+    """URL pública del PDF o ``None`` si aún no está lista."""
+    if nota.estado != 'lista' or not nota.archivo:
+        return None
+    return FileSystemStorage().url(nota.archivo)
+
+
+def reclamar_pendientes(lote=20):
+    """
+    Marca como ``procesando`` hasta ``lote`` notas pendientes y devuelve sus ids.
+    ``skip_locked`` permite correr varios workers sin que tomen la misma nota.
+
+    También reclama las notas abandonadas en ``procesando`` por más de
+    ``TIEMPO_MAXIMO_PROCESANDO``; las que ya agotaron ``MAX_INTENTOS`` pasan a
+    ``error``.
+    """
+    ahora = timezone.now()
+    abandonadas = Q(estado='procesando', fecha_actualizacion__lt=ahora - TIEMPO_MAXIMO_PROCESANDO)
+
+    with transaction.atomic():
+        NotaVenta.objects.filter(abandonadas, intentos__gte=MAX_INTENTOS).update(
+            estado='error',
+            error='El worker no terminó de generar la nota',
+            fecha_actualizacion=ahora,
+        )
+        ids = list(
+            NotaVenta.objects.select_for_update(skip_locked=True)
+            .filter(Q(estado='pendiente') | abandonadas)
+            .order_by('id')
+            .values_list('id', flat=True)[:lote]
+        )
+        if ids:
+            NotaVenta.objects.filter(id__in=ids).update(
+                estado='procesando',
+                intentos=F('intentos') + 1,
+                fecha_actualizacion=ahora,
+            )
+    return ids
+
+
+def procesar_nota(nota_id):
+    """Renderiza y guarda el PDF de una nota reclamada. Devuelve el estado final."""
+    nota = NotaVenta.objects.get(id=nota_id)
+    try:
+        venta = (
+            Venta.objects.select_related('usuario')
+            .prefetch_related('detalles__producto')
+            .get(id=nota.venta_id)
+        )
+        pdf_buffer = generar_nota_venta(venta)
+
+        fs = FileSystemStorage()
+        file_name = f"nota_venta_{venta.id}.pdf"
+        if nota.archivo and fs.exists(nota.archivo):
+            fs.delete(nota.archivo)
+        nota.archivo = fs.save(file_name, pdf_buffer)
+        nota.estado = 'lista'
+        nota.error = None
+    except Exception as e:
+        nota.error = str(e)
+        nota.estado = 'pendiente' if nota.intentos < MAX_INTENTOS else 'error'
+
+    nota.save(update_fields=['archivo', 'estado', 'error', 'fecha_actualizacion'])
+    return nota.estado
+
+
+def procesar_pendientes(lote=20):
+    """Procesa un lote de notas pendientes. Devuelve cuántas se tomaron."""
+    ids = reclamar_pendientes(lote)
+    for nota_id in ids:
+        procesar_nota(nota_id)
+    return len(ids)
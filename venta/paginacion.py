@@ -0,0 +1,14 @@
+from backend_smart_sales.paginacion import CursorPorTuplaPagination
+
+
+class VentaCursorPagination(CursorPorTuplaPagination):
+    """
+    Paginación por cursor (keyset) sobre la tupla ``(fecha, id)``.
+    Cada página es un rango del índice ``venta_fecha_id_idx``, por lo que la
+    latencia no crece con la profundidad de la página como con OFFSET, aunque
+    muchas ventas compartan la misma fecha.
+    """
+    ordering = ('-fecha', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
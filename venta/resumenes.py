@@ -0,0 +1,202 @@
+"""
+Mantenimiento de las tablas de resumen de ventas.
+
+``VentaDiaria`` guarda cantidad, ingresos y unidades por día y estado, y
+``ResumenCliente`` el total gastado y las compras pagadas de cada cliente.
+Ambas se actualizan dentro de la misma transacción que crea la venta o cambia
+su estado, de modo que los endpoints de análisis no necesitan re-agregar toda
+la tabla ``Venta`` en cada llamada.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Min, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import Venta, DetalleVenta, VentaDiaria, ResumenCliente
+
+
+def dia_de_venta(fecha):
+    """Día local (``TIME_ZONE``) al que pertenece una fecha de venta."""
+    if timezone.is_aware(fecha):
+        return timezone.localdate(fecha)
+    return fecha.date()
+
+
+def acumular_en_dia(dia, estado, cantidad=0, total=0, unidades=0):
+    """
+    Suma (o resta, con valores negativos) los valores dados a la fila
+    ``(dia, estado)`` de ``VentaDiaria``, creándola si no existe.
+    """
+    incremento = {
+        'cantidad': F('cantidad') + cantidad,
+        'total': F('total') + total,
+        'unidades': F('unidades') + unidades,
+    }
+    if VentaDiaria.objects.filter(fecha=dia, estado=estado).update(**incremento):
+        return
+
+    try:
+        with transaction.atomic():
+            VentaDiaria.objects.create(
+                fecha=dia, estado=estado, cantidad=cantidad, total=total, unidades=unidades
+            )
+    except IntegrityError:
+        # Otra transacción creó la fila entre el UPDATE y el INSERT
+        VentaDiaria.objects.filter(fecha=dia, estado=estado).update(**incremento)
+
+
+def registrar_venta_en_resumen(venta, unidades):
+    """Suma una venta recién creada al resumen diario."""
+    acumular_en_dia(dia_de_venta(venta.fecha), venta.estado, 1, venta.total, unidades)
+
+
+def cambiar_estado_en_resumen(ventas, estado_nuevo):
+    """
+    Mueve ``ventas`` de su estado actual a ``estado_nuevo`` en el resumen
+    diario. Debe llamarse antes de guardar el nuevo estado, mientras
+    ``venta.estado`` conserva el valor anterior.
+    """
+    ventas = [v for v in ventas if v.estado != estado_nuevo]
+    if not ventas:
+        return
+
+    unidades_por_venta = dict(
+        DetalleVenta.objects.filter(venta_id__in=[v.id for v in ventas])
+        .values('venta_id')
+        .annotate(unidades=Sum('cantidad'))
+        .values_list('venta_id', 'unidades')
+    )
+
+    movimientos = defaultdict(lambda: [0, Decimal('0'), 0])
+    for venta in ventas:
+        dia = dia_de_venta(venta.fecha)
+        unidades = unidades_por_venta.get(venta.id, 0)
+        for estado, signo in ((venta.estado, -1), (estado_nuevo, 1)):
+            movimiento = movimientos[(dia, estado)]
+            movimiento[0] += signo
+            movimiento[1] += signo * venta.total
+            movimiento[2] += signo * unidades
+
+    # Orden fijo de filas para no generar interbloqueos entre transacciones
+    for (dia, estado), (cantidad, total, unidades) in sorted(movimientos.items()):
+        acumular_en_dia(dia, estado, cantidad, total, unidades)
+
+
+@transaction.atomic
+def reconstruir_ventas_diarias():
+    """Recalcula ``VentaDiaria`` completo a partir de ``Venta`` y ``DetalleVenta``."""
+    totales = (
+        Venta.objects.annotate(dia=TruncDate('fecha'))
+        .values('dia', 'estado')
+        .annotate(cantidad=Count('id'), total=Sum('total'))
+        .order_by()
+    )
+    unidades = {
+        (fila['dia'], fila['venta__estado']): fila['unidades']
+        for fila in DetalleVenta.objects.annotate(dia=TruncDate('venta__fecha'))
+        .values('dia', 'venta__estado')
+        .annotate(unidades=Sum('cantidad'))
+        .order_by()
+    }
+
+    VentaDiaria.objects.all().delete()
+    filas = VentaDiaria.objects.bulk_create(
+        (
+            VentaDiaria(
+                fecha=fila['dia'],
+                estado=fila['estado'],
+                cantidad=fila['cantidad'],
+                total=fila['total'] or 0,
+                unidades=unidades.get((fila['dia'], fila['estado']), 0) or 0,
+            )
+            for fila in totales
+        ),
+        batch_size=1000,
+    )
+    return len(filas)
+
+
+def sumar_compra_a_cliente(venta):
+    """Suma una venta pagada recién creada al resumen de su cliente."""
+    if venta.estado != 'pagado':
+        return
+
+    incremento = {
+        'total_gastado': F('total_gastado') + venta.total,
+        'cantidad_compras': F('cantidad_compras') + 1,
+        'primera_compra': Coalesce(F('primera_compra'), Value(venta.fecha)),
+        'ultima_compra': Value(venta.fecha),
+        'ticket_promedio': ExpressionWrapper(
+            (F('total_gastado') + venta.total) / (F('cantidad_compras') + 1),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    }
+    if ResumenCliente.objects.filter(usuario_id=venta.usuario_id).update(**incremento):
+        return
+
+    try:
+        with transaction.atomic():
+            ResumenCliente.objects.create(
+                usuario_id=venta.usuario_id,
+                total_gastado=venta.total,
+                cantidad_compras=1,
+                primera_compra=venta.fecha,
+                ultima_compra=venta.fecha,
+                ticket_promedio=venta.total,
+            )
+    except IntegrityError:
+        ResumenCliente.objects.filter(usuario_id=venta.usuario_id).update(**incremento)
+
+
+def _resumenes_desde_ventas(ventas):
+    """Construye ``ResumenCliente`` (sin guardar) agrupando ventas pagadas por usuario."""
+    return {
+        fila['usuario_id']: ResumenCliente(
+            usuario_id=fila['usuario_id'],
+            total_gastado=fila['total'],
+            cantidad_compras=fila['cantidad'],
+            primera_compra=fila['primera'],
+            ultima_compra=fila['ultima'],
+            ticket_promedio=round(fila['total'] / fila['cantidad'], 2),
+        )
+        for fila in ventas.filter(estado='pagado')
+        .values('usuario_id')
+        .annotate(cantidad=Count('id'), total=Sum('total'), primera=Min('fecha'), ultima=Max('fecha'))
+        .order_by()
+    }
+
+
+def recalcular_resumen_clientes(usuario_ids):
+    """
+    Recalcula el resumen de los clientes indicados con una sola consulta
+    agrupada. Se usa cuando una venta deja de estar pagada (o vuelve a estarlo).
+    """
+    usuario_ids = set(usuario_ids)
+    if not usuario_ids:
+        return
+
+    resumenes = _resumenes_desde_ventas(Venta.objects.filter(usuario_id__in=usuario_ids))
+    for usuario_id in usuario_ids - resumenes.keys():
+        resumenes[usuario_id] = ResumenCliente(usuario_id=usuario_id)
+
+    ResumenCliente.objects.bulk_create(
+        sorted(resumenes.values(), key=lambda r: r.usuario_id),
+        update_conflicts=True,
+        unique_fields=['usuario'],
+        update_fields=[
+            'total_gastado', 'cantidad_compras', 'primera_compra',
+            'ultima_compra', 'ticket_promedio',
+        ],
+    )
+
+
+@transaction.atomic
+def reconstruir_resumen_clientes():
+    """Recalcula ``ResumenCliente`` completo a partir de ``Venta``."""
+    resumenes = _resumenes_desde_ventas(Venta.objects.all())
+    ResumenCliente.objects.all().delete()
+    ResumenCliente.objects.bulk_create(resumenes.values(), batch_size=1000)
+    return len(resumenes)
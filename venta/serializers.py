@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from .models import Venta, DetalleVenta , Garantia
+from .models import Venta, DetalleVenta , Garantia, NotaVenta
 from producto.serializers import ProductoSerializer
+from .notas import url_nota_venta
 
 
 class DetalleVentaSerializer(serializers.ModelSerializer):
@@ -25,3 +26,19 @@ class GarantiaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Garantia
         fields = ['id', 'producto', 'venta', 'fecha_inicio', 'fecha_fin', 'estado']
+
+
+class NotaVentaSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = NotaVenta
+        fields = ['venta', 'estado', 'url', 'intentos', 'error', 'fecha_creacion', 'fecha_actualizacion']
+
+    def get_url(self, obj):
+        """Retorna la URL del PDF si ya fue generado."""
+        url = url_nota_venta(obj)
+        request = self.context.get('request')
+        if url and request:
+            return request.build_absolute_uri(url)
+        return url
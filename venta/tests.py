@@ -1,3 +1,202 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from bitacora.models import Bitacora
+from categoria.models import Categoria
+from marca.models import Marca
+from producto.models import Producto
+from .consultas import CONSULTAS_LISTADO_VENTAS
+from .models import Venta, DetalleVenta, VentaDiaria, ResumenCliente
+from .resumenes import reconstruir_ventas_diarias, reconstruir_resumen_clientes
+
+
+class ListadoVentasConsultasTest(APITestCase):
+    """
+    Los listados de ventas deben costar el mismo número de consultas
+    sin importar cuántas ventas y detalles devuelvan.
+    """
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='clave-segura'
+        )
+        self.cliente = get_user_model().objects.create_user(
+            username='cliente', email='cliente@example.com', password='clave-segura'
+        )
+        marca = Marca.objects.create(nombre='Marca test')
+        categoria = Categoria.objects.create(nombre='Categoría test')
+        self.productos = [
+            Producto.objects.create(
+                nombre=f'Producto {i}', precio=10, stock=100,
+                marca=marca, categoria=categoria,
+            )
+            for i in range(3)
+        ]
+
+    def _crear_ventas(self, cantidad):
+        for _ in range(cantidad):
+            venta = Venta.objects.create(usuario=self.cliente, total=30, estado='pagado')
+            DetalleVenta.objects.bulk_create([
+                DetalleVenta(
+                    venta=venta, producto=producto, cantidad=1,
+                    precio_unitario=10, subtotal=10,
+                )
+                for producto in self.productos
+            ])
+
+    def _assert_consultas_constantes(self, usuario, url, consultas):
+        self.client.force_authenticate(usuario)
+
+        self._crear_ventas(1)
+        with self.assertNumQueries(consultas):
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+
+        self._crear_ventas(20)
+        with self.assertNumQueries(consultas):
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta
+
+    def test_listar_ventas(self):
+        respuesta = self._assert_consultas_constantes(
+            self.admin, '/api/ventas/', CONSULTAS_LISTADO_VENTAS
+        )
+        self.assertEqual(len(respuesta.data['results']), 21)
+        self.assertEqual(
+            respuesta.data['results'][0]['detalles'][0]['producto_detalle']['marca_nombre'],
+            'Marca test',
+        )
+
+    def test_orders_page(self):
+        respuesta = self._assert_consultas_constantes(
+            self.cliente, '/api/orders/', CONSULTAS_LISTADO_VENTAS
+        )
+        self.assertEqual(len(respuesta.data), 21)
+
+    def test_historial_ventas(self):
+        respuesta = self._assert_consultas_constantes(
+            self.admin, '/api/historial-ventas/', CONSULTAS_LISTADO_VENTAS
+        )
+        self.assertEqual(len(respuesta.data['results']), 21)
+
+    def test_historial_ventas_paginado_por_cursor(self):
+        self._crear_ventas(12)
+        self.client.force_authenticate(self.admin)
+
+        ids = []
+        url = '/api/historial-ventas/?page_size=5'
+        while url:
+            respuesta = self.client.get(url)
+            self.assertEqual(respuesta.status_code, 200)
+            ids.extend(venta['id'] for venta in respuesta.data['results'])
+            url = respuesta.data['next']
+
+        esperados = list(
+            Venta.objects.order_by('-fecha', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, esperados)
+
+    def test_cursor_con_fechas_empatadas(self):
+        self._crear_ventas(12)
+        Venta.objects.update(fecha=timezone.now())
+        self.client.force_authenticate(self.admin)
+
+        paginas = []
+        url = '/api/historial-ventas/?page_size=5'
+        while url:
+            respuesta = self.client.get(url)
+            self.assertEqual(respuesta.status_code, 200)
+            paginas.append([venta['id'] for venta in respuesta.data['results']])
+            anterior, url = respuesta.data['previous'], respuesta.data['next']
+
+        esperados = list(Venta.objects.order_by('-id').values_list('id', flat=True))
+        self.assertEqual(sum(paginas, []), esperados)
+
+        # Volver una página desde la última
+        respuesta = self.client.get(anterior)
+        self.assertEqual([venta['id'] for venta in respuesta.data['results']], paginas[-2])
+
+
+class CancelacionLoteTest(APITestCase):
+    """La cancelación en lote restaura stock y resúmenes en una sola transacción."""
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='clave-segura'
+        )
+        self.cliente = get_user_model().objects.create_user(
+            username='cliente', email='cliente@example.com', password='clave-segura'
+        )
+        marca = Marca.objects.create(nombre='Marca test')
+        categoria = Categoria.objects.create(nombre='Categoría test')
+        self.productos = [
+            Producto.objects.create(
+                nombre=f'Producto {i}', precio=10, stock=90,
+                marca=marca, categoria=categoria,
+            )
+            for i in range(3)
+        ]
+        self.ventas = []
+        for _ in range(4):
+            venta = Venta.objects.create(usuario=self.cliente, total=30, estado='pagado')
+            DetalleVenta.objects.bulk_create([
+                DetalleVenta(
+                    venta=venta, producto=producto, cantidad=2,
+                    precio_unitario=10, subtotal=20,
+                )
+                for producto in self.productos
+            ])
+            self.ventas.append(venta)
+        reconstruir_ventas_diarias()
+        reconstruir_resumen_clientes()
+
+    def test_cancelar_lote(self):
+        self.client.force_authenticate(self.admin)
+        self.ventas[3].estado = 'cancelado'
+        self.ventas[3].save()
+
+        ids = [venta.id for venta in self.ventas[:2]] + [self.ventas[3].id, 999999]
+        respuesta = self.client.post(
+            '/api/historial-ventas/cancelar-lote/', {'ventas': ids}, format='json'
+        )
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['canceladas'], ids[:2])
+        self.assertEqual(
+            {omitida['id'] for omitida in respuesta.data['omitidas']},
+            {self.ventas[3].id, 999999},
+        )
+        for producto in self.productos:
+            producto.refresh_from_db()
+            self.assertEqual(producto.stock, 94)
+        self.assertEqual(Bitacora.objects.filter(usuario=self.admin).count(), 1)
+
+        resumen = ResumenCliente.objects.get(usuario=self.cliente)
+        self.assertEqual(resumen.cantidad_compras, 1)
+        self.assertEqual(
+            VentaDiaria.objects.get(estado='cancelado').cantidad, 2
+        )
+
+    def test_cancelar_dos_veces(self):
+        self.client.force_authenticate(self.cliente)
+        url = f'/api/historial-ventas/{self.ventas[0].id}/cancelar/'
+
+        self.assertEqual(self.client.post(url).status_code, 200)
+        respuesta = self.client.post(url)
+
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.data['error'], 'La venta ya está cancelada')
+        for producto in self.productos:
+            producto.refresh_from_db()
+            self.assertEqual(producto.stock, 92)
+        self.assertEqual(Bitacora.objects.filter(usuario=self.cliente).count(), 1)
+
+    def test_cancelar_lote_requiere_admin(self):
+        self.client.force_authenticate(self.cliente)
+        respuesta = self.client.post(
+            '/api/historial-ventas/cancelar-lote/',
+            {'ventas': [self.ventas[0].id]}, format='json',
+        )
+        self.assertEqual(respuesta.status_code, 403)
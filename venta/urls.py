@@ -15,6 +15,7 @@ urlpatterns = [
     path('ventas/registrar/', views.registrar_venta, name='registrar_venta'),
     path('orders/', OrdersPageView.as_view(), name='user-orders'),
     path('ventas/<int:venta_id>/garantias/', views.obtener_garantias_por_venta, name='obtener_garantias_por_venta'),
+    path('ventas/<int:venta_id>/nota/', views.obtener_nota_venta, name='obtener_nota_venta'),
 
     # === STRIPE ===
     path('stripe/probar/', views.probar_stripe_key, name='probar_stripe_key'),
@@ -8,7 +8,17 @@ import stripe
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from .models import Venta, DetalleVenta , Garantia
-from .serializers import VentaSerializer, GarantiaSerializer
+from .serializers import VentaSerializer, GarantiaSerializer, NotaVentaSerializer
+from .notas import encolar_nota_venta
+from .consultas import ventas_con_detalles
+from .paginacion import VentaCursorPagination
+from .resumenes import (
+    registrar_venta_en_resumen,
+    cambiar_estado_en_resumen,
+    sumar_compra_a_cliente,
+    recalcular_resumen_clientes,
+)
+from .checkout import registrar_detalles_venta
 from producto.models import Producto
 from users.models import CustomUser
 from users.views import get_client_ip
@@ -18,13 +28,9 @@ from datetime import timedelta
 from django.utils import timezone
 from dateutil.relativedelta import relativedelta  # Correcta importación de relativedelta
 from datetime import datetime
-from django.core.files.storage import FileSystemStorage
 
 from rest_framework import permissions
 from rest_framework.views import APIView
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from io import BytesIO
 
 # Configurar Stripe
 stripe.api_key = settings.STRIPE_SECRET_KEY
@@ -92,74 +98,17 @@ def registrar_venta(request):
         venta = Venta.objects.create(usuario=usuario, total=total, estado="pagado")
         print(f"✅ Venta creada: {venta.id}  Total: {venta.total} - views.py:93")
 
-        # Crear los detalles
-        for item in productos:
-          #  try:
-                producto = Producto.objects.get(id=item['producto_id'])
-                cantidad = int(item['cantidad'])
-                print(f"✔️ Producto encontrado: {producto.nombre}  Cantidad: {cantidad} - views.py:100")
-
-                if producto.stock < cantidad:
-                    print(f"❌ Stock insuficiente para {producto.nombre} - views.py:103")
-                    raise ValueError(f"Stock insuficiente para {producto.nombre}")
-
-                subtotal = producto.precio * cantidad
-
-                DetalleVenta.objects.create(
-                    venta=venta,
-                    producto=producto,
-                    cantidad=cantidad,
-                    precio_unitario=producto.precio,
-                    subtotal=subtotal,
-                )
-                print(f"✅ Detalle de venta registrado: Producto: {producto.nombre}  Subtotal: {subtotal} - views.py:115")
-
-                # Establecer la fecha de inicio como la fecha de la venta
-                fecha_inicio = datetime.today().date()
-                print(f"📅 Fecha de inicio: {fecha_inicio} - views.py:119")
-
-                # Verifica el valor de producto.garantia
-                if hasattr(producto, 'garantia'):
-                    print(f"🔑 Duración de la garantía en meses: {producto.garantia} - views.py:123")
-                else:
-                    print("❌ El producto no tiene un campo 'garantia' definido correctamente. - views.py:125")
-
-                # Crear la garantía
-                garantia = Garantia.objects.create(
-                    producto=producto,
-                    venta=venta,
-                    fecha_fin=fecha_inicio + relativedelta(months=producto.garantia),
-
-                    fecha_inicio=fecha_inicio,
-                    estado='activa',
-                )
-
-                print(f"✅ Garantía creada: {producto.nombre}  Fecha de inicio: {garantia.fecha_inicio}  Fecha de fin: {garantia.fecha_fin} - views.py:137")
-
-           # except Producto.DoesNotExist:
-              #  print("❌ Producto no encontrado. - views.py:140")
-             #   return Response({'error': 'Producto no encontrado.'}, status=status.HTTP_404_NOT_FOUND)
-
-           # except Exception as e:
-               # print(f"❌ Error al procesar producto: {str(e)} - views.py:144")
-                continue  # Continuar con el siguiente producto
-
-            # Actualizar inventario
-                producto.stock -= cantidad
-                producto.save()
-                print(f"🛒 Inventario actualizado: {producto.nombre}  Stock restante: {producto.stock} - views.py:150")
-        
-        
-        
-        # Crear la nota de venta en PDF
-        pdf_buffer = generar_nota_venta(venta)
+        # Crear los detalles, garantías y descontar inventario en bloque
+        detalles = registrar_detalles_venta(venta, productos)
+        print(f"✅ {len(detalles)} detalles de venta registrados para la venta #{venta.id} - views.py:97")
 
-        # Guardar el PDF en el sistema de archivos
-        fs = FileSystemStorage()
-        file_name = f"nota_venta_{venta.id}.pdf"
-        pdf_path = fs.save(file_name, pdf_buffer)
+        # Actualizar el resumen diario de ventas y el del cliente
+        registrar_venta_en_resumen(venta, sum(d.cantidad for d in detalles))
+        sumar_compra_a_cliente(venta)
+
+        # Encolar la nota de venta; el PDF se genera fuera del request
+        nota = encolar_nota_venta(venta)
 
-        
         # Registrar en bitácora
         Bitacora.objects.create(
             usuario=usuario,
@@ -172,15 +121,17 @@ def registrar_venta(request):
         return Response({
             'mensaje': '✅ Venta registrada con éxito.',
             'venta': VentaSerializer(venta).data,
-            'nota_venta': fs.url(pdf_path)  # URL para acceder al archivo PDF  
+            'nota_venta': NotaVentaSerializer(nota, context={'request': request}).data
         }, status=status.HTTP_201_CREATED)
 
     except CustomUser.DoesNotExist:
         print("❌ Cliente no encontrado. - views.py:179")
+        transaction.set_rollback(True)
         return Response({'error': 'Cliente no encontrado.'}, status=status.HTTP_404_NOT_FOUND)
 
     except Exception as e:
         print(f"❌ Error general: {str(e)} - views.py:183")
+        transaction.set_rollback(True)
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -194,20 +145,26 @@ def registrar_venta(request):
 @permission_classes([IsAuthenticated])
 def listar_ventas(request):
     """
-    Lista todas las ventas registradas.
+    Lista todas las ventas registradas, paginadas por cursor sobre (fecha, id).
     Si el usuario no es admin, solo ve sus propias ventas.
+
+    Query params opcionales:
+    - cursor: cursor devuelto en `next`/`previous`
+    - page_size: ventas por página (default: 50, máximo: 500)
     """
     try:
         usuario = request.user
 
         # Si el usuario es admin, ve todas las ventas
         if usuario.is_staff or usuario.is_superuser:
-            ventas = Venta.objects.all().order_by('-id')
+            ventas = Venta.objects.all()
         else:
-            ventas = Venta.objects.filter(usuario=usuario).order_by('-id')
+            ventas = Venta.objects.filter(usuario=usuario)
 
-        serializer = VentaSerializer(ventas, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = VentaCursorPagination()
+        pagina = paginator.paginate_queryset(ventas_con_detalles(ventas), request)
+        serializer = VentaSerializer(pagina, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -225,7 +182,7 @@ def obtener_venta(request, venta_id):
     Devuelve los detalles de una venta específica.
     """
     try:
-        venta = Venta.objects.get(id=venta_id)
+        venta = ventas_con_detalles().get(id=venta_id)
 
         # Solo el usuario dueño o un admin puede verla
         if not (request.user.is_staff or request.user.is_superuser or venta.usuario == request.user):
@@ -283,7 +240,12 @@ def editar_venta(request, venta_id):
 
         if serializer.is_valid():
             print("✅ Datos validados correctamente. Campos válidos: - views.py:285", serializer.validated_data)
+            estado_nuevo = serializer.validated_data.get('estado')
+            if estado_nuevo:
+                cambiar_estado_en_resumen([venta], estado_nuevo)
             serializer.save()
+            if estado_nuevo:
+                recalcular_resumen_clientes([venta.usuario_id])
             print("💾 Venta actualizada exitosamente en BD. - views.py:287")
 
             # Registrar en bitácora
@@ -318,7 +280,7 @@ class OrdersPageView(APIView):
     def get(self, request):
         # Obtener todas las ventas del usuario autenticado
         user = request.user  # El usuario autenticado
-        orders = Venta.objects.filter(usuario=user)  # Filtrar las órdenes por el usuario autenticado
+        orders = ventas_con_detalles(Venta.objects.filter(usuario=user))  # Filtrar las órdenes por el usuario autenticado
         
         # Serializar las órdenes
         serializer = VentaSerializer(orders, many=True)
@@ -371,37 +333,35 @@ def obtener_garantias_por_venta(request, venta_id):
 
 
 
-# Función para generar el PDF de la nota de venta
-def generar_nota_venta(venta):
-    buffer = BytesIO()
-
-    c = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter  # Definir tamaño de página (carta)
-
-    # Título
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(30, height - 40, f"Nota de Venta #{venta.id}")
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def obtener_nota_venta(request, venta_id):
+    """
+    Devuelve el estado de la nota de venta en PDF.
+    Responde 202 mientras el PDF se está generando, 200 con la URL cuando está
+    listo y 500 si la generación falló definitivamente (no hay que seguir consultando).
+    """
+    try:
+        venta = Venta.objects.get(id=venta_id)
 
-    # Detalles de la venta
-    c.setFont("Helvetica", 12)
-    c.drawString(30, height - 60, f"Fecha: {venta.fecha}")
-    c.drawString(30, height - 80, f"Cliente: {venta.usuario.username}")
-    c.drawString(30, height - 100, f"Total: {venta.total} USD")
+        if not (request.user.is_staff or request.user.is_superuser or venta.usuario_id == request.user.id):
+            return Response({'error': 'No tiene permisos para ver esta nota de venta.'},
+                            status=status.HTTP_403_FORBIDDEN)
 
-    # Detalle de los productos
-    y_position = height - 140
-    c.drawString(30, y_position, "Productos:")
-    y_position -= 20
+        # Ventas anteriores a la cola no tienen trabajo: se encola al consultarla
+        nota = encolar_nota_venta(venta)
+        serializer = NotaVentaSerializer(nota, context={'request': request})
 
-    for detalle in venta.detalles.all():
-        producto = detalle.producto
-        c.drawString(30, y_position, f"{producto.nombre} - Cantidad: {detalle.cantidad} - Subtotal: {detalle.subtotal}")
-        y_position -= 20
+        if nota.estado == 'error':
+            return Response(
+                {'error': 'No se pudo generar la nota de venta.', 'nota': serializer.data},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
 
-    # Finalizar el PDF
-    c.showPage()
-    c.save()
+        codigo = status.HTTP_200_OK if nota.estado == 'lista' else status.HTTP_202_ACCEPTED
+        return Response(serializer.data, status=codigo)
 
-    # Regresar el archivo PDF generado
-    buffer.seek(0)
-    return buffer
\ No newline at end of file
+    except Venta.DoesNotExist:
+        return Response({'error': 'Venta no encontrada.'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)